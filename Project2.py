@@ -1,104 +1,413 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from datetime import datetime
-
-CSV_FILE = 'expenses.csv'
-
-# Here we Initialize file
-def init_file():
-    try:
-        pd.read_csv(CSV_FILE)
-    except FileNotFoundError:
-        df = pd.DataFrame(columns=["Date", "Category", "Amount", "Note"])
-        df.to_csv(CSV_FILE, index=False)
-
-# Add an expense
-def add_expense():
-    date_input = input("Date (YYYY-MM-DD) [default: today]: ")
-    date = date_input if date_input else datetime.today().strftime('%Y-%m-%d')
-    category = input("Category (e.g., Food, Transport): ")
-    amount = float(input("Amount: "))
-    note = input("Note (optional): ")
-
-    new_expense = pd.DataFrame([[date, category, amount, note]],
-                               columns=["Date", "Category", "Amount", "Note"])
-    df = pd.read_csv(CSV_FILE)
-    df = pd.concat([df, new_expense], ignore_index=True)
-    df.to_csv(CSV_FILE, index=False)
-    print("Expense added!")
-
-# Weekly or Monthly summary
-def generate_summary(period="monthly"):
-    df = pd.read_csv(CSV_FILE)
-    df['Date'] = pd.to_datetime(df['Date'])
-
-    if period == "weekly":
-        df['Week'] = df['Date'].dt.to_period('W')
-        summary = df.groupby(['Week', 'Category'])['Amount'].sum().unstack().fillna(0)
-    else:
-        df['Month'] = df['Date'].dt.to_period('M')
-        summary = df.groupby(['Month', 'Category'])['Amount'].sum().unstack().fillna(0)
-
-    print(f"\n {period.capitalize()} Summary:\n")
-    print(summary.round(2))
-
-# Visualize with Matplotlib & NumPy
-def plot_expenses():
-    df = pd.read_csv(CSV_FILE)
-    df['Date'] = pd.to_datetime(df['Date'])
-    df['Month'] = df['Date'].dt.to_period('M')
-
-    monthly = df.groupby(['Month', 'Category'])['Amount'].sum().unstack().fillna(0)
-
-    # Convert PeriodIndex to strings for plotting
-    months = monthly.index.astype(str)
-    categories = monthly.columns
-    data = monthly.to_numpy()
-
-    x = np.arange(len(months))
-    fig, ax = plt.subplots(figsize=(10, 6))
-
-    # Stack bars
-    bottom = np.zeros(len(months))
-    for i, category in enumerate(categories):
-        ax.bar(x, data[:, i], bottom=bottom, label=category)
-        bottom += data[:, i]
-
-    ax.set_title(" Monthly Expenses by Category")
-    ax.set_xlabel("Month")
-    ax.set_ylabel("Amount")
-    ax.set_xticks(x)
-    ax.set_xticklabels(months, rotation=45)
-    ax.legend()
-    plt.tight_layout()
-    plt.show()
-
-# Main Menu
-def main():
-    init_file()
-    while True:
-        print("\n Expense Tracker")
-        print("1. Add Expense")
-        print("2. Weekly Summary")
-        print("3. Monthly Summary")
-        print("4. Visualize Expenses")
-        print("5. Exit")
-
-        choice = input("Choose option: ")
-        if choice == '1':
-            add_expense()
-        elif choice == '2':
-            generate_summary("weekly")
-        elif choice == '3':
-            generate_summary("monthly")
-        elif choice == '4':
-            plot_expenses()
-        elif choice == '5':
-            print("👋 Goodbye!")
-            break
-        else:
-            print("Invalid choice. Try again.")
-
-if __name__ == "__main__":
-    main()
+import os
+import csv
+import json
+import argparse
+import numpy as np
+import storage
+import instrument
+from datetime import datetime, timedelta
+from lazyimport import lazy_import
+
+# Heavy libraries are imported on first use
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+
+CSV_FILE = 'expenses.csv'
+JOURNAL_FILE = 'expenses.journal.csv'
+SNAPSHOT_FILE = 'expenses.snapshot.cols'  # or .parquet / .feather
+ROLLUP_FILE = 'expenses.rollup.json'
+COLUMNS = ["Date", "Category", "Amount", "Note"]
+FSYNC_EVERY = 32        # journal appends between fsyncs
+COMPACT_EVERY = 10000   # journal rows before folding them into the snapshot
+MEMORY_BUDGET_MB = 256  # peak working set for streaming summaries
+MENU_ACTIONS = {'1': 'add_expense', '2': 'weekly_summary', '3': 'monthly_summary', '4': 'visualize',
+                '5': 'compact', '6': 'rebuild_summaries', '7': 'streaming_summary', '8': 'exit'}
+
+_journal_rows = None
+_unsynced = 0
+_rollups = None
+
+# Here we Initialize file
+def init_file():
+    # First run: an existing expenses.csv becomes the initial snapshot
+    if not storage.exists(SNAPSHOT_FILE):
+        try:
+            df = pd.read_csv(CSV_FILE)
+        except FileNotFoundError:
+            df = pd.DataFrame(columns=COLUMNS)
+        write_snapshot(df)
+    if not os.path.exists(JOURNAL_FILE):
+        _reset_journal(JOURNAL_FILE)
+    # A compaction interrupted by a crash leaves the rotated journal behind
+    if os.path.exists(JOURNAL_FILE + '.old'):
+        compact()
+    # Rollups missed an append (e.g. crash after the journal write)
+    if load_rollups()["rows"] != _ledger_rows():
+        rebuild_rollups()
+
+# Columnar snapshot: dates as datetime64, categories dictionary-encoded
+def write_snapshot(df, folded=(0, 0)):
+    df = df[COLUMNS].copy()
+    df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce').astype(np.float64)
+    df['Note'] = df['Note'].fillna('').astype(str)
+    storage.save_table(df, SNAPSHOT_FILE, dates=["Date"], categories=["Category"],
+                       meta={"folded": list(folded)})
+
+def read_snapshot():
+    if not storage.exists(SNAPSHOT_FILE):
+        return pd.DataFrame(columns=COLUMNS), (0, 0)
+    df = storage.load_table(SNAPSHOT_FILE)
+    df['Category'] = df['Category'].astype(object)
+    return df, tuple(storage.load_meta(SNAPSHOT_FILE)["folded"])
+
+def _reset_journal(path):
+    with open(path, 'w', newline='') as f:
+        csv.writer(f).writerow(COLUMNS)
+        f.flush()
+        os.fsync(f.fileno())
+
+def _read_journal(path):
+    df = pd.read_csv(path)
+    instrument.count("rows_read", len(df))
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    return df
+
+# Identity of a rotated journal, recorded in the snapshot that folds it in
+def _file_id(path):
+    st = os.stat(path)
+    return (st.st_ino, st.st_size)
+
+# Snapshot plus the journal tail: the full ledger
+@instrument.timed("load")
+def load_expenses():
+    df, folded = read_snapshot()
+    parts = [df]
+    old = JOURNAL_FILE + '.old'
+    if os.path.exists(old) and _file_id(old) != folded:
+        parts.append(_read_journal(old))
+    if os.path.exists(JOURNAL_FILE):
+        parts.append(_read_journal(JOURNAL_FILE))
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+def _count_journal_rows():
+    global _journal_rows
+    if _journal_rows is None:
+        with open(JOURNAL_FILE, 'rb') as f:
+            _journal_rows = max(0, sum(1 for _ in f) - 1)
+    return _journal_rows
+
+def _ledger_rows():
+    snapshot_rows = storage.table_rows(SNAPSHOT_FILE) if storage.exists(SNAPSHOT_FILE) else 0
+    return snapshot_rows + _count_journal_rows()
+
+@instrument.timed("journal_append")
+def _append_rows(rows, sync=False):
+    global _journal_rows, _unsynced
+    _count_journal_rows()
+    with open(JOURNAL_FILE, 'a', newline='') as f:
+        writer = csv.writer(f)
+        start = f.tell()
+        writer.writerows(rows)
+        f.flush()
+        instrument.count("rows_written", len(rows))
+        instrument.count("bytes_written", f.tell() - start)
+        _unsynced += len(rows)
+        _journal_rows += len(rows)
+        if sync or _unsynced >= FSYNC_EVERY:
+            os.fsync(f.fileno())
+            _unsynced = 0
+    update_rollups(rows)
+    if _journal_rows >= COMPACT_EVERY:
+        compact()
+
+# Force any batched journal appends to disk
+def sync_journal():
+    global _unsynced
+    if _unsynced:
+        with open(JOURNAL_FILE, 'a') as f:
+            os.fsync(f.fileno())
+        _unsynced = 0
+
+# Fold the journal into the snapshot and start a fresh journal
+@instrument.timed("compact")
+def compact():
+    global _journal_rows, _unsynced
+    old = JOURNAL_FILE + '.old'
+    if not os.path.exists(old):
+        os.replace(JOURNAL_FILE, old)
+        _reset_journal(JOURNAL_FILE)
+    df, folded = read_snapshot()
+    if _file_id(old) != folded:
+        df = pd.concat([p for p in [df, _read_journal(old)] if not p.empty] or [df], ignore_index=True)
+        write_snapshot(df, folded=_file_id(old))
+    os.remove(old)
+    _journal_rows = None
+    _unsynced = 0
+
+def _expense_row(date, category, amount, note=""):
+    return [date or datetime.today().strftime('%Y-%m-%d'), category, float(amount), note]
+
+# Add many expenses at once: one append, one fsync
+def add_expenses(expenses):
+    rows = [_expense_row(*expense) for expense in expenses]
+    if rows:
+        _append_rows(rows, sync=True)
+    return len(rows)
+
+# Add an expense; prompts for whatever the command line did not supply
+def add_expense(date=None, category=None, amount=None, note=None):
+    if category is None:
+        date_input = input("Date (YYYY-MM-DD) [default: today]: ")
+        date = date_input if date_input else datetime.today().strftime('%Y-%m-%d')
+        category = input("Category (e.g., Food, Transport): ")
+        amount = float(input("Amount: "))
+        note = input("Note (optional): ")
+
+    _append_rows([_expense_row(date, category, amount, note)])
+    print("Expense added!")
+
+# Materialized (period, category) sums, kept up to date on every append
+def _week_key(date):
+    return (date - timedelta(days=date.weekday())).strftime('%Y-%m-%d')
+
+def _month_key(date):
+    return date.strftime('%Y-%m')
+
+def load_rollups():
+    global _rollups
+    if _rollups is None:
+        try:
+            with open(ROLLUP_FILE) as f:
+                _rollups = json.load(f)
+        except FileNotFoundError:
+            _rollups = {"rows": 0, "weekly": {}, "monthly": {}}
+    return _rollups
+
+def save_rollups():
+    tmp = ROLLUP_FILE + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(_rollups, f)
+    os.replace(tmp, ROLLUP_FILE)
+
+@instrument.timed("rollup_update")
+def update_rollups(rows):
+    rollups = load_rollups()
+    for date, category, amount, _note in rows:
+        rollups["rows"] += 1
+        if not category:
+            continue
+        try:
+            day = datetime.strptime(str(date)[:10], '%Y-%m-%d')
+        except ValueError:
+            continue
+        amount = 0.0 if amount != amount else amount
+        for period, key in (("weekly", _week_key(day)), ("monthly", _month_key(day))):
+            cell = rollups[period].setdefault(key, {})
+            cell[category] = cell.get(category, 0.0) + amount
+    save_rollups()
+
+# Regenerate the rollup store from the raw ledger
+@instrument.timed("rollup_rebuild")
+def rebuild_rollups():
+    global _rollups
+    df = load_expenses()
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
+    _rollups = {"rows": len(df)}
+    for period, freq in (("weekly", 'W'), ("monthly", 'M')):
+        sums = df.groupby([df['Date'].dt.to_period(freq).dt.start_time, 'Category'])['Amount'].sum()
+        store = {}
+        for (start, category), amount in sums.items():
+            key = _week_key(start) if period == "weekly" else _month_key(start)
+            store.setdefault(key, {})[category] = float(amount)
+        _rollups[period] = store
+    save_rollups()
+
+@instrument.timed("summary")
+def rollup_table(period="monthly"):
+    store = load_rollups()["weekly" if period == "weekly" else "monthly"]
+    freq, name = ('W', 'Week') if period == "weekly" else ('M', 'Month')
+    summary = pd.DataFrame.from_dict(store, orient='index', dtype=float).fillna(0)
+    summary = summary.sort_index().sort_index(axis=1)
+    summary.index = pd.PeriodIndex([pd.Period(key, freq=freq) for key in summary.index],
+                                   freq=freq, name=name)
+    summary.columns.name = 'Category'
+    return summary
+
+# Weekly or Monthly summary
+def generate_summary(period="monthly"):
+    _print_summary(period, rollup_table(period))
+
+def _print_summary(period, summary):
+    print(f"\n {period.capitalize()} Summary:\n")
+    print(summary.round(2))
+
+# Out-of-core summary: bounded chunks, partial (period, category) sums merged
+def _chunk_rows(path, memory_budget_mb):
+    if not os.path.exists(path):
+        return 100000
+    sample = pd.read_csv(path, usecols=["Date", "Category", "Amount"], nrows=1000)
+    # Date parsing and the period column roughly triple a raw chunk
+    row_bytes = 3 * max(64, sample.memory_usage(deep=True).sum() // max(1, len(sample)))
+    return max(1000, int(memory_budget_mb * 1024 * 1024 // row_bytes))
+
+def _partial_sums(dates, categories, amounts, period):
+    instrument.count("rows_read", len(amounts))
+    freq, name = ('W', 'Week') if period == "weekly" else ('M', 'Month')
+    # Coerced so an empty or odd chunk still sums as float, like the rollups
+    amounts = pd.to_numeric(pd.Series(amounts, dtype=object), errors="coerce").astype(float).to_numpy()
+    chunk = pd.DataFrame({"Date": pd.to_datetime(dates), "Category": categories, "Amount": amounts})
+    chunk[name] = chunk['Date'].dt.to_period(freq)
+    return chunk.groupby([name, 'Category'])['Amount'].sum()
+
+def _stream_csv(path, period, chunk_rows):
+    for chunk in pd.read_csv(path, usecols=["Date", "Category", "Amount"], chunksize=chunk_rows):
+        yield _partial_sums(chunk['Date'], chunk['Category'], chunk['Amount'], period)
+
+def _stream_ledger(period, chunk_rows):
+    folded = (0, 0)
+    if storage.exists(SNAPSHOT_FILE):
+        folded = tuple(storage.load_meta(SNAPSHOT_FILE)["folded"])
+        for chunk in storage.iter_chunks(SNAPSHOT_FILE, ["Date", "Category", "Amount"], chunk_rows):
+            yield _partial_sums(chunk['Date'], chunk['Category'].astype(object), chunk['Amount'], period)
+    old = JOURNAL_FILE + '.old'
+    if os.path.exists(old) and _file_id(old) != folded:
+        yield from _stream_csv(old, period, chunk_rows)
+    if os.path.exists(JOURNAL_FILE):
+        yield from _stream_csv(JOURNAL_FILE, period, chunk_rows)
+
+@instrument.timed("stream")
+def stream_summary(period="monthly", path=None, memory_budget_mb=MEMORY_BUDGET_MB):
+    if path:
+        partials = _stream_csv(path, period, _chunk_rows(path, memory_budget_mb))
+    else:
+        partials = _stream_ledger(period, _chunk_rows(JOURNAL_FILE, memory_budget_mb))
+
+    total = None
+    for partial in partials:
+        if partial.empty:   # e.g. a journal holding only its header
+            continue
+        total = partial if total is None else total.add(partial, fill_value=0)
+    if total is None or total.empty:
+        return _partial_sums([], [], [], period).unstack().fillna(0)
+    return total.unstack().fillna(0)
+
+# Visualize with Matplotlib & NumPy
+def plot_expenses(path=None):
+    monthly = rollup_table("monthly")
+
+    # Convert PeriodIndex to strings for plotting
+    months = monthly.index.astype(str)
+    categories = monthly.columns
+    data = monthly.to_numpy()
+
+    x = np.arange(len(months))
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # Stack bars
+    bottom = np.zeros(len(months))
+    for i, category in enumerate(categories):
+        ax.bar(x, data[:, i], bottom=bottom, label=category)
+        bottom += data[:, i]
+
+    ax.set_title(" Monthly Expenses by Category")
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Amount")
+    ax.set_xticks(x)
+    ax.set_xticklabels(months, rotation=45)
+    ax.legend()
+    plt.tight_layout()
+    if path:
+        fig.savefig(path)
+        plt.close(fig)
+    else:
+        plt.show()
+
+# Main Menu
+def main():
+    init_file()
+    while True:
+        print("\n Expense Tracker")
+        print("1. Add Expense")
+        print("2. Weekly Summary")
+        print("3. Monthly Summary")
+        print("4. Visualize Expenses")
+        print("5. Compact Ledger")
+        print("6. Rebuild Summaries")
+        print("7. Streaming Summary (large CSV)")
+        print("8. Exit")
+
+        choice = input("Choose option: ")
+        with instrument.action(MENU_ACTIONS.get(choice, "invalid")):
+            if choice == '1':
+                add_expense()
+            elif choice == '2':
+                generate_summary("weekly")
+            elif choice == '3':
+                generate_summary("monthly")
+            elif choice == '4':
+                plot_expenses()
+            elif choice == '5':
+                compact()
+                print("Ledger compacted.")
+            elif choice == '6':
+                rebuild_rollups()
+                print("Summaries rebuilt.")
+            elif choice == '7':
+                path = input("CSV path [default: ledger]: ")
+                period = "weekly" if input("Period (weekly/monthly) [monthly]: ") == "weekly" else "monthly"
+                _print_summary(period, stream_summary(period, path or None))
+            elif choice == '8':
+                sync_journal()
+                print("👋 Goodbye!")
+                break
+            else:
+                print("Invalid choice. Try again.")
+
+# Non-interactive commands for scripts and cron; no command starts the menu
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Expense Tracker")
+    commands = parser.add_subparsers(dest="command")
+    add = commands.add_parser("add-expense", help="append one expense")
+    add.add_argument("category")
+    add.add_argument("amount", type=float)
+    add.add_argument("--date", help="YYYY-MM-DD (default: today)")
+    add.add_argument("--note", default="")
+    summary = commands.add_parser("summary", help="print the weekly or monthly summary")
+    summary.add_argument("period", choices=["weekly", "monthly"], nargs="?", default="monthly")
+    stream = commands.add_parser("stream-summary", help="out-of-core summary of the ledger or a CSV")
+    stream.add_argument("--path")
+    stream.add_argument("--period", choices=["weekly", "monthly"], default="monthly")
+    stream.add_argument("--budget-mb", type=int, default=MEMORY_BUDGET_MB)
+    plot = commands.add_parser("plot", help="monthly chart, to a file when --out is given")
+    plot.add_argument("--out")
+    commands.add_parser("compact", help="fold the journal into the snapshot")
+    commands.add_parser("rebuild-summaries", help="recompute the rollups from the ledger")
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        main()
+        return
+    init_file()
+    with instrument.action(args.command.replace("-", "_")):
+        if args.command == "add-expense":
+            add_expense(args.date or datetime.today().strftime('%Y-%m-%d'), args.category, args.amount, args.note)
+        elif args.command == "summary":
+            generate_summary(args.period)
+        elif args.command == "stream-summary":
+            _print_summary(args.period, stream_summary(args.period, args.path, args.budget_mb))
+        elif args.command == "plot":
+            plot_expenses(args.out)
+        elif args.command == "compact":
+            compact()
+            print("Ledger compacted.")
+        elif args.command == "rebuild-summaries":
+            rebuild_rollups()
+            print("Summaries rebuilt.")
+    sync_journal()
+
+if __name__ == "__main__":
+    cli()
@@ -1,123 +1,521 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from datetime import datetime
-
-CSV_FILE = 'covid_data.csv'
-
-def init_file():
-    try:
-        pd.read_csv(CSV_FILE)
-    except FileNotFoundError:
-        df = pd.DataFrame(columns=["Date", "City", "New_Cases", "Recoveries", "Deaths"])
-        df.to_csv(CSV_FILE, index=False)
-
-def add_daily_data():
-    date = input("Date (YYYY-MM-DD) [default: today]: ") or datetime.today().strftime('%Y-%m-%d')
-    city = input("City Name: ")
-    new_cases = int(input("New Cases: "))
-    recoveries = int(input("Recoveries: "))
-    deaths = int(input("Deaths: "))
-
-    new_data = pd.DataFrame([[date, city, new_cases, recoveries, deaths]],
-                            columns=["Date", "City", "New_Cases", "Recoveries", "Deaths"])
-
-    df = pd.read_csv(CSV_FILE)
-    df = pd.concat([df, new_data], ignore_index=True)
-    df.to_csv(CSV_FILE, index=False)
-    print("✅ Data added successfully!\n")
-
-def import_csv():
-    file_path = input("Enter CSV file path to import: ")
-    try:
-        new_data = pd.read_csv(file_path)
-        df = pd.read_csv(CSV_FILE)
-        df = pd.concat([df, new_data], ignore_index=True)
-        df.to_csv(CSV_FILE, index=False)
-        print("📥 Data imported successfully!")
-    except Exception as e:
-        print(f" Error importing: {e}")
-
-def risk_zone_analysis():
-    df = pd.read_csv(CSV_FILE)
-    recent = df.groupby('City').tail(7)
-    summary = recent.groupby('City')[['New_Cases']].sum()
-
-    def classify_risk(row):
-        if row['New_Cases'] >= 100:
-            return 'Red Zone'
-        elif row['New_Cases'] >= 30:
-            return ' Orange Zone'
-        else:
-            return 'Green Zone'
-
-    summary['Risk_Zone'] = summary.apply(classify_risk, axis=1)
-    print("\nRisk Zone Analysis (Last 7 Days):\n")
-    print(summary)
-
-def predict_hotspots():
-    df = pd.read_csv(CSV_FILE)
-    df['Date'] = pd.to_datetime(df['Date'])
-    df = df.sort_values(by='Date')
-
-    # Rolling average for the last 7 days per city
-    rolling = df.groupby('City')['New_Cases'].rolling(window=7, min_periods=1).mean().reset_index()
-    latest = rolling.groupby('City').tail(1)
-
-    threshold = latest['New_Cases'].mean() + latest['New_Cases'].std()
-    hotspots = latest[latest['New_Cases'] > threshold]
-
-    print("\n Predicted Hotspots (Based on 7-Day Avg & Std):\n")
-    print(hotspots[['City', 'New_Cases']].round(2))
-
-def plot_trends():
-    df = pd.read_csv(CSV_FILE)
-    df['Date'] = pd.to_datetime(df['Date'])
-    cities = df['City'].unique()
-
-    for city in cities:
-        city_data = df[df['City'] == city].groupby('Date')[['New_Cases', 'Recoveries', 'Deaths']].sum()
-        city_data = city_data.rolling(window=7).mean()  # Smooth trend
-
-        plt.figure(figsize=(10, 5))
-        plt.plot(city_data.index, city_data['New_Cases'], label='New Cases')
-        plt.plot(city_data.index, city_data['Recoveries'], label='Recoveries')
-        plt.plot(city_data.index, city_data['Deaths'], label='Deaths')
-        plt.title(f"📊 COVID Trend - {city}")
-        plt.xlabel("Date")
-        plt.ylabel("Cases")
-        plt.legend()
-        plt.grid(True)
-        plt.tight_layout()
-        plt.show()
-
-def main():
-    init_file()
-    while True:
-        print("\n COVID Dashboard")
-        print("1. Add Daily Data")
-        print("2. Import CSV Data")
-        print("3. Risk Zone Analysis")
-        print("4. Predict Hotspots")
-        print("5. Plot Trend Visualizations")
-        print("6. Exit")
-
-        choice = input("Choose option: ")
-        if choice == '1':
-            add_daily_data()
-        elif choice == '2':
-            import_csv()
-        elif choice == '3':
-            risk_zone_analysis()
-        elif choice == '4':
-            predict_hotspots()
-        elif choice == '5':
-            plot_trends()
-        elif choice == '6':
-            print("👋 Exiting Dashboard.")
-            break
-        else:
-            print("Invalid input. Try again.")
-
-if __name__ == "__main__":
-    main()
+import os
+import re
+import glob
+import json
+import time
+import argparse
+import hashlib
+import numpy as np
+import storage
+import instrument
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from lazyimport import lazy_import
+
+# Heavy libraries are imported on first use
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+
+CSV_FILE = 'covid_data.csv'
+DATA_STORE = 'covid_data.cols'  # or .parquet / .feather
+COLUMNS = ["Date", "City", "New_Cases", "Recoveries", "Deaths"]
+COUNT_COLUMNS = ["New_Cases", "Recoveries", "Deaths"]
+WINDOW = 7
+WINDOW_SNAPSHOT = 'covid_window.npz'
+REJECTED_FILE = 'rejected_rows.csv'
+TRENDS_DIR = 'trend_charts'
+TRENDS_INDEX = 'index.json'
+MENU_ACTIONS = {'1': 'add_daily_data', '2': 'import_csv', '3': 'risk_zone_analysis', '4': 'predict_hotspots',
+                '5': 'plot_trends', '6': 'export_csv', '7': 'bulk_import', '8': 'export_trends', '9': 'exit'}
+FEED_DTYPES = {"Date": str, "City": str, "New_Cases": "float64", "Recoveries": "float64", "Deaths": "float64"}
+
+# Last WINDOW (date, new cases) entries per city in a fixed-size ring buffer,
+# with a running sum, so window analytics cost O(cities) whatever the history.
+class CityWindowStore:
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.rows = 0           # dataset rows folded in, to detect a stale snapshot
+        self.cities = []
+        self.index = {}
+        self.dates = np.zeros((0, window), dtype='datetime64[D]')
+        self.cases = np.zeros((0, window), dtype=np.int64)
+        self.head = np.zeros(0, dtype=np.int64)   # slot of the oldest entry
+        self.count = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros(0, dtype=np.int64)
+
+    def _row(self, city):
+        row = self.index.get(city)
+        if row is None:
+            row = len(self.cities)
+            if row == len(self.head):
+                grow = max(16, row)
+                self.dates = np.concatenate([self.dates, np.zeros((grow, self.window), dtype='datetime64[D]')])
+                self.cases = np.concatenate([self.cases, np.zeros((grow, self.window), dtype=np.int64)])
+                self.head, self.count, self.sums = (np.concatenate([a, np.zeros(grow, dtype=np.int64)])
+                                                    for a in (self.head, self.count, self.sums))
+            self.cities.append(city)
+            self.index[city] = row
+        return row
+
+    def _ordered(self, row):
+        slots = (self.head[row] + np.arange(self.count[row])) % self.window
+        return self.dates[row, slots], self.cases[row, slots]
+
+    def push(self, date, city, new_cases):
+        row = self._row(city)
+        date = np.datetime64(date, 'D')
+        new_cases = int(new_cases)
+        w, head, count = self.window, self.head[row], self.count[row]
+        if count == 0 or date >= self.dates[row, (head + count - 1) % w]:
+            if count < w:
+                slot = (head + count) % w
+                self.count[row] += 1
+            else:
+                slot = head
+                self.sums[row] -= self.cases[row, slot]
+                self.head[row] = (head + 1) % w
+            self.dates[row, slot] = date
+            self.cases[row, slot] = new_cases
+            self.sums[row] += new_cases
+            return
+        # Late arrival: re-lay the (at most WINDOW) entries in date order
+        dates, cases = self._ordered(row)
+        at = np.searchsorted(dates, date, side='right')
+        dates = np.insert(dates, at, date)[-w:]
+        cases = np.insert(cases, at, new_cases)[-w:]
+        n = len(dates)
+        self.dates[row, :n], self.cases[row, :n] = dates, cases
+        self.head[row], self.count[row], self.sums[row] = 0, n, cases.sum()
+
+    def push_frame(self, df):
+        df = df[['Date', 'City', 'New_Cases']].dropna(subset=['Date', 'City'])
+        df = df.assign(Date=pd.to_datetime(df['Date']), New_Cases=df['New_Cases'].fillna(0))
+        # Only each city's newest WINDOW incoming rows can end up in its window
+        recent = df.sort_values('Date', kind='stable').groupby('City', observed=True).tail(self.window)
+        for date, city, new_cases in recent.itertuples(index=False):
+            self.push(date, city, new_cases)
+
+    def totals(self):
+        n = len(self.cities)
+        return pd.Series(self.sums[:n], index=pd.Index(self.cities, name='City'))
+
+    def means(self):
+        n = len(self.cities)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.Series(self.sums[:n] / self.count[:n], index=pd.Index(self.cities, name='City'))
+
+    def save(self, path=WINDOW_SNAPSHOT):
+        n = len(self.cities)
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, window=self.window, rows=self.rows, cities=np.asarray(self.cities, dtype=str),
+                 dates=self.dates[:n], cases=self.cases[:n],
+                 head=self.head[:n], count=self.count[:n], sums=self.sums[:n])
+        os.replace(tmp, path)
+
+    @classmethod
+    def restore(cls, path=WINDOW_SNAPSHOT):
+        with np.load(path, allow_pickle=False) as snap:
+            store = cls(int(snap["window"]))
+            store.rows = int(snap["rows"])
+            store.cities = snap["cities"].tolist()
+            store.index = {city: row for row, city in enumerate(store.cities)}
+            store.dates, store.cases = snap["dates"], snap["cases"]
+            store.head, store.count, store.sums = snap["head"], snap["count"], snap["sums"]
+        return store
+
+_window = None
+_date_index = None
+
+# Restore the window store from its snapshot, or rebuild it from the dataset
+@instrument.timed("window")
+def get_window():
+    global _window
+    if _window is None:
+        rows = storage.table_rows(DATA_STORE)
+        try:
+            _window = CityWindowStore.restore()
+        except FileNotFoundError:
+            _window = None
+        if _window is None or _window.rows != rows or _window.window != WINDOW:
+            _window = CityWindowStore()
+            _window.push_frame(load_data(['Date', 'City', 'New_Cases']))
+            _window.rows = rows
+            _window.save()
+    return _window
+
+@instrument.timed("window_update")
+def _feed_window(new_data):
+    window = get_window()
+    window.push_frame(new_data)
+    window.rows += len(new_data)
+    window.save()
+
+def init_file():
+    # The binary store is seeded from covid_data.csv the first time
+    if not storage.exists(DATA_STORE):
+        try:
+            df = pd.read_csv(CSV_FILE)
+        except FileNotFoundError:
+            df = pd.DataFrame(columns=COLUMNS)
+        save_data(df)
+
+@instrument.timed("load")
+def load_data(columns=None):
+    return storage.load_table(DATA_STORE, columns)
+
+@instrument.timed("persist")
+def save_data(df):
+    global _date_index
+    _date_index = None
+    df = df[COLUMNS].copy()
+    for col in COUNT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    storage.save_table(df, DATA_STORE, dates=["Date"], categories=["City"])
+
+def export_csv():
+    storage.table_to_csv(DATA_STORE, CSV_FILE)
+    print(f"Data exported to {CSV_FILE}")
+
+# Menu actions prompt for whatever the command line did not supply
+def add_daily_data(date=None, city=None, new_cases=None, recoveries=None, deaths=None):
+    if city is None:
+        date = input("Date (YYYY-MM-DD) [default: today]: ") or datetime.today().strftime('%Y-%m-%d')
+        city = input("City Name: ")
+        new_cases = int(input("New Cases: "))
+        recoveries = int(input("Recoveries: "))
+        deaths = int(input("Deaths: "))
+    date = date or datetime.today().strftime('%Y-%m-%d')
+
+    new_data = pd.DataFrame([[date, city, new_cases, recoveries, deaths]],
+                            columns=COLUMNS)
+
+    get_window()
+    df = load_data()
+    df = pd.concat([df, new_data], ignore_index=True)
+    save_data(df)
+    _feed_window(new_data)
+    print("✅ Data added successfully!\n")
+
+def import_csv(file_path=None):
+    file_path = file_path or input("Enter CSV file path to import: ")
+    try:
+        new_data = pd.read_csv(file_path)
+        get_window()
+        df = load_data()
+        df = pd.concat([df, new_data], ignore_index=True)
+        save_data(df)
+        _feed_window(new_data)
+        print("📥 Data imported successfully!")
+    except Exception as e:
+        print(f" Error importing: {e}")
+
+# Parse one feed file in a worker process
+def _parse_feed(path):
+    try:
+        feed = pd.read_csv(path, usecols=COLUMNS, dtype=FEED_DTYPES)
+    except (ValueError, OSError, pd.errors.ParserError) as e:
+        return path, None, str(e)
+    # The text as written stays for the rejected-rows report
+    feed['Raw_Date'] = feed['Date']
+    feed['Date'] = pd.to_datetime(feed['Date'], format='%Y-%m-%d', errors='coerce')
+    feed['Source'] = os.path.basename(path)
+    return path, feed, None
+
+def _feed_paths(pattern):
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.csv')
+    return sorted(glob.glob(pattern))
+
+# Load many daily feeds at once: parallel parse, vectorized checks, one write
+def bulk_import(pattern, workers=None):
+    start = time.perf_counter()
+    paths = _feed_paths(pattern)
+    feeds, failed = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, feed, error in pool.map(_parse_feed, paths):
+            if error:
+                failed.append((path, error))
+            else:
+                feeds.append(feed)
+    if not feeds:
+        print(f" No feeds loaded from {pattern!r}.")
+        for path, error in failed:
+            print(f"   {path}: {error}")
+        return {"files": len(paths), "accepted": 0, "rejected": 0, "failed_files": len(failed)}
+    rows = pd.concat(feeds, ignore_index=True)
+    instrument.count("rows_read", len(rows))
+
+    counts = rows[COUNT_COLUMNS]
+    existing = load_data(['Date', 'City'])
+    keys = pd.MultiIndex.from_arrays([rows['Date'], rows['City']])
+    old_keys = pd.MultiIndex.from_arrays([existing['Date'], existing['City'].astype(object)])
+    invalid = [rows['Date'].isna().to_numpy(),
+               rows['City'].fillna('').str.strip().eq('').to_numpy(),
+               counts.isna().any(axis=1).to_numpy(),
+               (counts < 0).any(axis=1).to_numpy(),
+               (counts % 1 != 0).any(axis=1).to_numpy()]
+    # Only rows that are otherwise valid can claim a (Date, City) first
+    valid = ~np.logical_or.reduce(invalid)
+    duplicate = np.zeros(len(rows), dtype=bool)
+    duplicate[valid] = keys[valid].duplicated(keep='first')
+    reason = np.select(
+        invalid + [duplicate, keys.isin(old_keys)],
+        ['bad date', 'missing city', 'missing count', 'negative count', 'fractional count',
+         'duplicate in import', 'already recorded'],
+        default='')
+    ok = reason == ''
+    instrument.count("rows_rejected", int((~ok).sum()))
+    accepted = rows.loc[ok, COLUMNS].astype({col: 'int64' for col in COUNT_COLUMNS})
+    rejected = (rows.loc[~ok].assign(Date=lambda r: r['Raw_Date'], Reason=reason[~ok])
+                .drop(columns='Raw_Date'))
+
+    if len(accepted):
+        get_window()
+        save_data(pd.concat([load_data(), accepted], ignore_index=True))
+        _feed_window(accepted)
+    if len(rejected):
+        rejected.to_csv(REJECTED_FILE, index=False)
+
+    elapsed = time.perf_counter() - start
+    print(f"📥 Imported {len(accepted)} rows from {len(feeds)} files "
+          f"in {elapsed:.2f}s ({len(rows) / max(elapsed, 1e-9):,.0f} rows/sec)")
+    if len(rejected):
+        print(f" Rejected {len(rejected)} rows (see {REJECTED_FILE}):")
+        print(rejected['Reason'].value_counts().to_string())
+    for path, error in failed:
+        print(f" Skipped {path}: {error}")
+    return {"files": len(paths), "accepted": len(accepted), "rejected": len(rejected),
+            "failed_files": len(failed), "seconds": elapsed}
+
+# New cases sorted by (City, Date) with prefix sums: any date window per city
+# is two binary searches and a subtraction.
+class CityDateIndex:
+    def __init__(self, df):
+        df = df.dropna(subset=['Date', 'City'])
+        codes, cities = pd.factorize(df['City'].astype(object), sort=True)
+        days = df['Date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        cases = df['New_Cases'].fillna(0).to_numpy(dtype=np.int64)
+        self.cities = pd.Index(cities, name='City')
+        self.base = days.min() if len(days) else 0
+        self.span = (days.max() - self.base + 1) if len(days) else 1
+        order = np.lexsort((days, codes))
+        self.keys = codes[order].astype(np.int64) * self.span + (days[order] - self.base)
+        self.prefix = np.concatenate([[0], np.cumsum(cases[order])])
+        self.last = np.datetime64(int(self.base + self.span - 1), 'D')
+
+    def range_sums(self, start, end):
+        lo = max(np.datetime64(start, 'D').astype(np.int64) - self.base, 0)
+        hi = min(np.datetime64(end, 'D').astype(np.int64) - self.base, self.span - 1)
+        if lo > hi or not len(self.cities):
+            return pd.Series(0, index=self.cities, dtype=np.int64)
+        offsets = np.arange(len(self.cities), dtype=np.int64) * self.span
+        left = np.searchsorted(self.keys, offsets + lo, side='left')
+        right = np.searchsorted(self.keys, offsets + hi, side='right')
+        return pd.Series(self.prefix[right] - self.prefix[left], index=self.cities)
+
+    def last_days(self, days, end=None):
+        end = np.datetime64(end, 'D') if end else self.last
+        return self.range_sums(end - (days - 1), end)
+
+@instrument.timed("date_index")
+def get_date_index():
+    global _date_index
+    if _date_index is None:
+        _date_index = CityDateIndex(load_data(['Date', 'City', 'New_Cases']))
+    return _date_index
+
+# Risk zones over the last `days` calendar days (ending at the latest report),
+# or over an explicit start..end date range
+def risk_zone_analysis(days=7, start=None, end=None):
+    index = get_date_index()
+    if start:
+        summary = index.range_sums(start, end or index.last).to_frame('New_Cases')
+        title = f"{start} to {end or index.last}"
+    else:
+        summary = index.last_days(days, end).to_frame('New_Cases')
+        title = f"Last {days} Days"
+
+    cases = summary['New_Cases'].to_numpy()
+    summary['Risk_Zone'] = np.select([cases >= 100, cases >= 30], ['Red Zone', ' Orange Zone'], 'Green Zone')
+    print(f"\nRisk Zone Analysis ({title}):\n")
+    print(summary)
+
+def predict_hotspots():
+    # Mean of each city's last 7 entries, straight from the window store
+    latest = get_window().means().sort_index().rename('New_Cases').reset_index()
+
+    threshold = latest['New_Cases'].mean() + latest['New_Cases'].std()
+    hotspots = latest[latest['New_Cases'] > threshold]
+
+    print("\n Predicted Hotspots (Based on 7-Day Avg & Std):\n")
+    print(hotspots[['City', 'New_Cases']].round(2))
+
+# One groupby pass: per-city daily totals in date order
+def _city_trends(df):
+    daily = df.groupby(['City', 'Date'], observed=True)[COUNT_COLUMNS].sum()
+    for city, city_data in daily.groupby(level='City', observed=True):
+        yield city, city_data.droplevel('City')
+
+def _draw_trend(ax, city_data, title):
+    city_data = city_data.rolling(window=7).mean()  # Smooth trend
+    ax.plot(city_data.index, city_data['New_Cases'], label='New Cases')
+    ax.plot(city_data.index, city_data['Recoveries'], label='Recoveries')
+    ax.plot(city_data.index, city_data['Deaths'], label='Deaths')
+    ax.set_title(title)
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Cases")
+    ax.legend()
+    ax.grid(True)
+
+def plot_trends():
+    for city, city_data in _city_trends(load_data()):
+        fig, ax = plt.subplots(figsize=(10, 5))
+        _draw_trend(ax, city_data, f"📊 COVID Trend - {city}")
+        plt.tight_layout()
+        plt.show()
+
+_render_fig = None
+
+# Worker setup: headless backend and one figure reused for every chart
+def _init_render_worker():
+    global _render_fig
+    plt.switch_backend('Agg')
+    _render_fig = plt.figure(figsize=(10, 5))
+
+def _render_trend(task):
+    city, city_data, path = task
+    _render_fig.clear()
+    ax = _render_fig.add_subplot()
+    _draw_trend(ax, city_data, f"COVID Trend - {city}")
+    _render_fig.tight_layout()
+    _render_fig.savefig(path)
+    return city
+
+def _trend_filename(city, fmt):
+    safe = re.sub(r'[^\w.-]+', '_', str(city)).strip('_') or 'city'
+    return f"{safe}-{hashlib.sha1(str(city).encode()).hexdigest()[:8]}.{fmt}"
+
+# Headless export: one PNG/SVG per city, rendered in a process pool, skipping
+# cities whose data is unchanged since the last export
+@instrument.timed("render")
+def export_trends(out_dir=TRENDS_DIR, fmt='png', workers=None):
+    os.makedirs(out_dir, exist_ok=True)
+    index_path = os.path.join(out_dir, TRENDS_INDEX)
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        index = {}
+
+    tasks, outputs = [], {}
+    for city, city_data in _city_trends(load_data()):
+        digest = hashlib.sha1(pd.util.hash_pandas_object(city_data).to_numpy().tobytes()).hexdigest()
+        name = _trend_filename(city, fmt)
+        outputs[str(city)] = {"file": name, "hash": digest}
+        previous = index.get(str(city))
+        if previous != outputs[str(city)] or not os.path.exists(os.path.join(out_dir, name)):
+            tasks.append((city, city_data, os.path.join(out_dir, name)))
+
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker) as pool:
+            list(pool.map(_render_trend, tasks, chunksize=max(1, len(tasks) // (8 * (os.cpu_count() or 1)))))
+
+    tmp = index_path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(outputs, f, indent=1)
+    os.replace(tmp, index_path)
+    print(f"📊 Rendered {len(tasks)} charts, {len(outputs) - len(tasks)} unchanged, index: {index_path}")
+    return outputs
+
+def main():
+    init_file()
+    while True:
+        print("\n COVID Dashboard")
+        print("1. Add Daily Data")
+        print("2. Import CSV Data")
+        print("3. Risk Zone Analysis")
+        print("4. Predict Hotspots")
+        print("5. Plot Trend Visualizations")
+        print("6. Export CSV")
+        print("7. Bulk Import Feeds")
+        print("8. Export Trend Charts (headless)")
+        print("9. Exit")
+
+        choice = input("Choose option: ")
+        with instrument.action(MENU_ACTIONS.get(choice, "invalid")):
+            if choice == '1':
+                add_daily_data()
+            elif choice == '2':
+                import_csv()
+            elif choice == '3':
+                window = input("Days [7] or date range YYYY-MM-DD:YYYY-MM-DD: ")
+                if ':' in window:
+                    risk_zone_analysis(start=window.split(':')[0], end=window.split(':')[1])
+                else:
+                    risk_zone_analysis(int(window or 7))
+            elif choice == '4':
+                predict_hotspots()
+            elif choice == '5':
+                plot_trends()
+            elif choice == '6':
+                export_csv()
+            elif choice == '7':
+                bulk_import(input("Feed directory or glob: "))
+            elif choice == '8':
+                fmt = input("Format (png/svg) [png]: ") or 'png'
+                export_trends(input(f"Output directory [{TRENDS_DIR}]: ") or TRENDS_DIR, fmt)
+            elif choice == '9':
+                print("👋 Exiting Dashboard.")
+                break
+            else:
+                print("Invalid input. Try again.")
+
+# Non-interactive commands for scripts and cron; no command starts the menu
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="COVID Dashboard")
+    commands = parser.add_subparsers(dest="command")
+    add = commands.add_parser("add", help="record one day for one city")
+    add.add_argument("city")
+    add.add_argument("new_cases", type=int)
+    add.add_argument("recoveries", type=int)
+    add.add_argument("deaths", type=int)
+    add.add_argument("--date", help="YYYY-MM-DD (default: today)")
+    load = commands.add_parser("import", help="append a CSV file")
+    load.add_argument("path")
+    risk = commands.add_parser("risk", help="risk zones for the last N days or a date range")
+    risk.add_argument("--days", type=int, default=7)
+    risk.add_argument("--start")
+    risk.add_argument("--end")
+    commands.add_parser("hotspots", help="predicted hotspots from the 7-day window")
+    commands.add_parser("export-csv", help=f"write the store back to {CSV_FILE}")
+    bulk = commands.add_parser("bulk-import", help="load a directory or glob of daily feeds")
+    bulk.add_argument("pattern")
+    bulk.add_argument("--workers", type=int)
+    trends = commands.add_parser("export-trends", help="render every city's trend chart to files")
+    trends.add_argument("--out", default=TRENDS_DIR)
+    trends.add_argument("--format", choices=["png", "svg"], default="png")
+    trends.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        main()
+        return
+    init_file()
+    with instrument.action(args.command.replace("-", "_")):
+        if args.command == "add":
+            add_daily_data(args.date, args.city, args.new_cases, args.recoveries, args.deaths)
+        elif args.command == "import":
+            import_csv(args.path)
+        elif args.command == "risk":
+            risk_zone_analysis(args.days, args.start, args.end)
+        elif args.command == "hotspots":
+            predict_hotspots()
+        elif args.command == "export-csv":
+            export_csv()
+        elif args.command == "bulk-import":
+            bulk_import(args.pattern, args.workers)
+        elif args.command == "export-trends":
+            export_trends(args.out, args.format, args.workers)
+
+if __name__ == "__main__":
+    cli()
@@ -1,156 +1,980 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
-
-BOOKS_FILE = "books.csv"
-ISSUED_FILE = "issued_books.csv"
-USER_LOG_FILE = "user_log.csv"
-FINE_PER_DAY = 2  # INR or USD per day late
-
-# Initialize CSVs
-def init_files():
-    for file, columns in [(BOOKS_FILE, ["Book_ID", "Title", "Author", "Copies"]),
-                          (ISSUED_FILE, ["Book_ID", "User", "Issue_Date", "Due_Date"]),
-                          (USER_LOG_FILE, ["User", "Book_ID", "Action", "Date", "Fine"])]:
-        try:
-            pd.read_csv(file)
-        except FileNotFoundError:
-            pd.DataFrame(columns=columns).to_csv(file, index=False)
-
-# Add a book
-def add_book():
-    book_id = input("Book ID: ")
-    title = input("Title: ")
-    author = input("Author: ")
-    copies = int(input("Number of Copies: "))
-
-    books = pd.read_csv(BOOKS_FILE)
-    books = pd.concat([books, pd.DataFrame([[book_id, title, author, copies]],
-                                           columns=books.columns)], ignore_index=True)
-    books.to_csv(BOOKS_FILE, index=False)
-    print(" Book added!")
-
-# List all books
-def list_books():
-    books = pd.read_csv(BOOKS_FILE)
-    print("\n Book Inventory:\n", books)
-
-# Issue a book
-def issue_book():
-    book_id = input("Book ID to issue: ")
-    user = input("User name: ")
-    books = pd.read_csv(BOOKS_FILE)
-    book = books[books['Book_ID'] == book_id]
-
-    if book.empty or int(book.iloc[0]['Copies']) <= 0:
-        print(" Book not available.")
-        return
-
-    books.loc[books['Book_ID'] == book_id, 'Copies'] -= 1
-    books.to_csv(BOOKS_FILE, index=False)
-
-    issue_date = datetime.today()
-    due_date = issue_date + timedelta(days=14)
-    issued = pd.read_csv(ISSUED_FILE)
-    issued = pd.concat([issued, pd.DataFrame([[book_id, user, issue_date.strftime('%Y-%m-%d'), due_date.strftime('%Y-%m-%d')]],
-                                             columns=issued.columns)], ignore_index=True)
-    issued.to_csv(ISSUED_FILE, index=False)
-
-    log_action(user, book_id, "Issue", issue_date.strftime('%Y-%m-%d'), 0)
-    print(" Book issued until", due_date.date())
-
-# Return a book
-def return_book():
-    book_id = input("Book ID to return: ")
-    user = input("User name: ")
-    issued = pd.read_csv(ISSUED_FILE)
-    books = pd.read_csv(BOOKS_FILE)
-
-    match = issued[(issued['Book_ID'] == book_id) & (issued['User'] == user)]
-    if match.empty:
-        print(" No matching issued book found.")
-        return
-
-    due_date = datetime.strptime(match.iloc[0]['Due_Date'], '%Y-%m-%d')
-    return_date = datetime.today()
-    days_late = (return_date - due_date).days
-    fine = max(0, days_late * FINE_PER_DAY)
-
-    # Remove from issued
-    issued = issued.drop(match.index)
-    issued.to_csv(ISSUED_FILE, index=False)
-
-    # Add copy back
-    books.loc[books['Book_ID'] == book_id, 'Copies'] += 1
-    books.to_csv(BOOKS_FILE, index=False)
-
-    log_action(user, book_id, "Return", return_date.strftime('%Y-%m-%d'), fine)
-    print(f" Book returned! Fine: ₹{fine}" if fine else " Book returned on time.")
-
-# Log action
-def log_action(user, book_id, action, date, fine):
-    log = pd.read_csv(USER_LOG_FILE)
-    new_entry = pd.DataFrame([[user, book_id, action, date, fine]], columns=log.columns)
-    log = pd.concat([log, new_entry], ignore_index=True)
-    log.to_csv(USER_LOG_FILE, index=False)
-
-# View usage chart
-def most_borrowed_chart():
-    log = pd.read_csv(USER_LOG_FILE)
-    borrowed = log[log['Action'] == "Issue"]
-    top = borrowed['Book_ID'].value_counts().head(5)
-
-    if top.empty:
-        print(" No borrow data available.")
-        return
-
-    plt.figure(figsize=(8, 5))
-    top.plot(kind='bar', color='skyblue')
-    plt.title(" Most Borrowed Books")
-    plt.ylabel("Times Borrowed")
-    plt.xlabel("Book ID")
-    plt.xticks(rotation=0)
-    plt.tight_layout()
-    plt.show()
-
-# Export user log
-def export_logs():
-    log = pd.read_csv(USER_LOG_FILE)
-    export_path = "exported_user_log.csv"
-    log.to_csv(export_path, index=False)
-    print(f" User log exported to {export_path}")
-
-# Menu
-def menu():
-    init_files()
-    while True:
-        print("\n Library System Menu")
-        print("1. Add Book")
-        print("2. List Books")
-        print("3. Issue Book")
-        print("4. Return Book")
-        print("5. Most Borrowed Books Chart")
-        print("6. Export User Log")
-        print("7. Exit")
-
-        choice = input("Choose option: ")
-        if choice == '1':
-            add_book()
-        elif choice == '2':
-            list_books()
-        elif choice == '3':
-            issue_book()
-        elif choice == '4':
-            return_book()
-        elif choice == '5':
-            most_borrowed_chart()
-        elif choice == '6':
-            export_logs()
-        elif choice == '7':
-            print("Exiting system.")
-            break
-        else:
-            print(" Invalid choice.")
-
-if __name__ == "__main__":
-    menu()
+import re
+import csv
+import json
+import math
+import argparse
+import heapq
+import time
+import sqlite3
+import threading
+import numpy as np
+import instrument
+from datetime import datetime, timedelta
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from lazyimport import lazy_import
+
+# Heavy libraries are imported on first use
+asyncio = lazy_import("asyncio")
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+
+BOOKS_FILE = "books.csv"
+ISSUED_FILE = "issued_books.csv"
+USER_LOG_FILE = "user_log.csv"
+LIBRARY_DB = "library.db"
+FINE_PER_DAY = 2  # INR or USD per day late
+LOAN_DAYS = 14
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+DB_WORKERS = 8
+WRITE_BATCH = 256      # most issues/returns per group commit
+SKETCH_SIZE = 0        # >0 also tracks popularity in a bounded Space-Saving sketch
+TOP_K_CACHE = 64       # leading books kept ranked as issues come in
+EXPORT_CHUNK = 10000   # log rows per export write
+PAGE_SIZE = 20         # books per page in list_books and search
+TITLE_WEIGHT = 2.0     # a title word counts double an author word when ranking
+PREFIX_EXPANSION = 32  # commonest completions tried for a trailing partial word
+MENU_ACTIONS = {'1': 'add_book', '2': 'list_books', '3': 'issue_book', '4': 'return_book', '5': 'most_borrowed_chart',
+                '6': 'export_logs', '7': 'import_csv_files', '8': 'overdue_report', '9': 'due_soon',
+                '10': 'search_books', '11': 'exit'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    Book_ID TEXT PRIMARY KEY, Title TEXT, Author TEXT, Copies INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS issued_books (
+    Book_ID TEXT NOT NULL, User TEXT NOT NULL, Issue_Date TEXT, Due_Date TEXT);
+CREATE INDEX IF NOT EXISTS issued_book_user ON issued_books (Book_ID, User);
+CREATE INDEX IF NOT EXISTS issued_due ON issued_books (Due_Date);
+CREATE TABLE IF NOT EXISTS user_log (
+    User TEXT, Book_ID TEXT, Action TEXT, Date TEXT, Fine NUMERIC);
+CREATE TABLE IF NOT EXISTS issue_counts (
+    Book_ID TEXT PRIMARY KEY, Issues INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS daily_issues (
+    Day TEXT NOT NULL, Book_ID TEXT NOT NULL, Issues INTEGER NOT NULL, PRIMARY KEY (Day, Book_ID));
+CREATE TABLE IF NOT EXISTS book_terms (
+    Term TEXT NOT NULL, Book_ID TEXT NOT NULL, Weight REAL NOT NULL, PRIMARY KEY (Term, Book_ID)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS book_terms_impact ON book_terms (Term, Weight DESC, Book_ID);
+CREATE TABLE IF NOT EXISTS term_stats (
+    Term TEXT PRIMARY KEY, Books INTEGER NOT NULL) WITHOUT ROWID;
+"""
+
+_local = threading.local()
+_due_index = None
+_popularity = None
+_search_index = None
+
+# One connection per thread; WAL keeps readers off the writer's back
+def get_db():
+    db = getattr(_local, "db", None)
+    if db is None:
+        db = _local.db = sqlite3.connect(LIBRARY_DB, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+    return db
+
+# Initialize the catalog; the old CSV files are imported on first run
+def init_files():
+    db = get_db()
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    if version == 0:
+        import_csv_files()
+    if version < 2:
+        rebuild_popularity()
+    if version < 3:
+        if version:  # a fresh import has just built the search index
+            rebuild_search_index()
+        db.execute("PRAGMA user_version = 3")
+
+# Load books.csv, issued_books.csv and user_log.csv in one transaction. Each
+# file found replaces its table, so importing again does not duplicate loans,
+# log rows or stock.
+@instrument.timed("import")
+def import_csv_files():
+    global _due_index, _popularity, _search_index
+    _due_index = _popularity = _search_index = None
+    db = get_db()
+    with db:
+        for file, table, columns in [(BOOKS_FILE, "books", ["Book_ID", "Title", "Author", "Copies"]),
+                                     (ISSUED_FILE, "issued_books", ["Book_ID", "User", "Issue_Date", "Due_Date"]),
+                                     (USER_LOG_FILE, "user_log", ["User", "Book_ID", "Action", "Date", "Fine"])]:
+            try:
+                df = pd.read_csv(file, dtype={"Book_ID": str, "User": str})
+            except FileNotFoundError:
+                continue
+            instrument.count("rows_read", len(df))
+            if table == "issued_books":
+                # A loan without a due date is still open: kept with a NULL
+                # Due_Date, left out of the due index and never fined
+                df["Due_Date"] = df["Due_Date"].astype(str).str.strip().where(df["Due_Date"].notna())
+                df.loc[df["Due_Date"] == "", "Due_Date"] = None
+            db.execute(f"DELETE FROM {table}")
+            rows = df[columns].astype(object).where(df[columns].notna(), None).itertuples(index=False)
+            if table == "books":
+                db.executemany("INSERT INTO books VALUES (?, ?, ?, ?) ON CONFLICT(Book_ID) "
+                               "DO UPDATE SET Copies = Copies + excluded.Copies", rows)
+            else:
+                db.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})", rows)
+        _rebuild_counts(db)
+        _rebuild_terms(db)
+
+# True when there is nothing an import would wipe out
+def catalog_empty():
+    db = get_db()
+    return not any(db.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone()
+                   for table in ("books", "issued_books", "user_log"))
+
+def add(book_id, title, author, copies):
+    db = get_db()
+    with db:
+        new = db.execute("SELECT 1 FROM books WHERE Book_ID = ?", (book_id,)).fetchone() is None
+        db.execute("INSERT INTO books VALUES (?, ?, ?, ?) ON CONFLICT(Book_ID) "
+                   "DO UPDATE SET Copies = Copies + excluded.Copies", (book_id, title, author, copies))
+        if new:
+            _index_books(db, [(book_id, title, author)])
+
+# Add a book
+def add_book(book_id=None, title=None, author=None, copies=None):
+    if book_id is None:
+        book_id = input("Book ID: ")
+        title = input("Title: ")
+        author = input("Author: ")
+        copies = int(input("Number of Copies: "))
+
+    add(book_id, title, author, copies)
+    print(" Book added!")
+
+# List the inventory one page at a time
+def list_books(page=None, per_page=PAGE_SIZE):
+    total = get_db().execute("SELECT COUNT(*) FROM books").fetchone()[0]
+    pages = max(1, -(-total // per_page))
+    if page is None:
+        page = int(input(f"Page (1-{pages}) [1]: ") or 1)
+    books = pd.DataFrame(_book_rows(per_page, (page - 1) * per_page),
+                         columns=["Book_ID", "Title", "Author", "Copies"])
+    print(f"\n Book Inventory (page {page} of {pages}, {total} books):\n", books)
+
+# Catalog search: an inverted index of Title/Author words in SQLite
+# (book_terms: word -> books with a weight, term_stats: word -> book count)
+# plus the sorted vocabulary in memory for autocomplete.
+def _tokens(text):
+    return re.findall(r"[a-z0-9]+", str(text or "").lower())
+
+def _book_terms(book_id, title, author):
+    weights = defaultdict(float)
+    for term in _tokens(title):
+        weights[term] += TITLE_WEIGHT
+    for term in _tokens(author):
+        weights[term] += 1.0
+    return [(term, book_id, weight) for term, weight in weights.items()]
+
+# Index brand-new books (joins the caller's transaction)
+def _index_books(db, books):
+    rows = [row for book in books for row in _book_terms(*book)]
+    db.executemany("INSERT OR REPLACE INTO book_terms VALUES (?, ?, ?)", rows)
+    counts = Counter(term for term, _, _ in rows)
+    db.executemany("INSERT INTO term_stats VALUES (?, ?) "
+                   "ON CONFLICT(Term) DO UPDATE SET Books = Books + excluded.Books", counts.items())
+    if _search_index is not None:
+        _search_index.update(counts, len(books))
+
+def _rebuild_terms(db):
+    global _search_index
+    _search_index = None
+    db.execute("DELETE FROM book_terms")
+    db.execute("DELETE FROM term_stats")
+    cursor = db.execute("SELECT Book_ID, Title, Author FROM books")
+    while books := cursor.fetchmany(EXPORT_CHUNK):
+        _index_books(db, books)
+
+def rebuild_search_index():
+    db = get_db()
+    with db:
+        _rebuild_terms(db)
+
+# The vocabulary kept sorted: all completions of a prefix are one contiguous
+# run found by bisect (a flattened prefix trie), ranked by how many books use them
+class TermIndex:
+    def __init__(self, rows, total_books):
+        self.lock = threading.Lock()
+        self.books = dict(rows)
+        self.terms = sorted(self.books)
+        self.total = total_books
+
+    def update(self, counts, new_books):
+        with self.lock:
+            for term, n in counts.items():
+                if term not in self.books:
+                    insort(self.terms, term)
+                self.books[term] = self.books.get(term, 0) + n
+            self.total += new_books
+
+    def completions(self, prefix, k):
+        with self.lock:
+            lo = bisect_left(self.terms, prefix)
+            hi = bisect_left(self.terms, prefix + "\uffff")
+            return heapq.nlargest(k, self.terms[lo:hi], key=self.books.__getitem__)
+
+    def idf(self, term):
+        return math.log(1 + self.total / max(self.books.get(term, 0), 1))
+
+def get_search_index():
+    global _search_index
+    if _search_index is None:
+        db = get_db()
+        _search_index = TermIndex(db.execute("SELECT Term, Books FROM term_stats"),
+                                  db.execute("SELECT COUNT(*) FROM books").fetchone()[0])
+    return _search_index
+
+# Words for autocomplete, most widely used first
+def suggest(prefix, k=10):
+    words = _tokens(prefix)
+    return get_search_index().completions(words[-1], k) if words else []
+
+# One word's postings, highest weight x idf first (ties by Book_ID), read
+# lazily off the book_terms_impact index
+def _postings(db, term, idf):
+    for book_id, weight in db.execute("SELECT Book_ID, Weight FROM book_terms WHERE Term = ? "
+                                      "ORDER BY Weight DESC, Book_ID", (term,)):
+        yield -weight * idf, book_id
+
+# A book's best weight x idf over one query word's terms, or None if it has none
+def _group_score(db, group, idfs, book_id):
+    hits = db.execute(f"SELECT Term, Weight FROM book_terms WHERE Book_ID = ? AND Term IN "
+                      f"({', '.join('?' * len(group))})", (book_id, *group)).fetchall()
+    return max((weight * idfs[term] for term, weight in hits), default=None)
+
+# Books matching every word of the query (the last one may be partial), ranked
+# by summed weight x idf. Each word's postings are read in impact order, a row
+# at a time from each in turn; a newly seen book is scored in full by point
+# lookups, and the scan stops once the best score an unseen book could still
+# reach cannot make the page (threshold algorithm). Returns (total matches, one
+# page as a DataFrame); the total is None when the scan stopped early and only
+# a single word's count is known.
+@instrument.timed("search")
+def search(query, page=1, per_page=PAGE_SIZE):
+    words = _tokens(query)
+    empty = pd.DataFrame(columns=["Book_ID", "Title", "Author", "Copies", "Score"])
+    if not words:
+        return 0, empty
+    index = get_search_index()
+    groups = [[word] for word in words]
+    if not query[-1].isspace():
+        groups[-1] = index.completions(words[-1], PREFIX_EXPANSION)
+        # The word exactly as typed always counts, however rare it is
+        if words[-1] in index.books and words[-1] not in groups[-1]:
+            groups[-1].append(words[-1])
+    groups = [[term for term in group if term in index.books] for group in groups]
+    if not all(groups):
+        return 0, empty
+
+    db = get_db()
+    idfs = {term: index.idf(term) for group in groups for term in group}
+    # A book's first row in a word's merged stream is its best term for that word
+    streams = [heapq.merge(*(_postings(db, term, idfs[term]) for term in group)) for group in groups]
+    # Per word, the impact and Book_ID last read: no unseen book can beat them
+    frontier = [[max(db.execute("SELECT MAX(Weight) FROM book_terms WHERE Term = ?",
+                                (term,)).fetchone()[0] * idfs[term] for term in group), ""]
+                for group in groups]
+    need = page * per_page
+    best = []           # sorted (-score, Book_ID), at most `need` long
+    seen = set()
+    matches = 0
+    exhausted = False
+    while not exhausted:
+        for i, stream in enumerate(streams):
+            row = next(stream, None)
+            if row is None:
+                # Every book with this word has been seen, so has every match
+                exhausted = True
+                break
+            neg, book_id = row
+            frontier[i] = [-neg, book_id]
+            if book_id in seen:
+                continue
+            seen.add(book_id)
+            score = 0.0
+            for j, group in enumerate(groups):
+                part = -neg if j == i else _group_score(db, group, idfs, book_id)
+                if part is None:
+                    break
+                score += part
+            else:
+                matches += 1
+                insort(best, (-score, book_id))
+                if len(best) > need:
+                    best.pop()
+        else:
+            # An unseen book scores at most the frontier sum, and on a tie comes
+            # after every Book_ID read so far (ties are read in Book_ID order)
+            threshold = 0.0
+            for bound, _ in frontier:
+                threshold += bound
+            if len(best) == need and (-threshold, max(book_id for _, book_id in frontier)) > best[-1]:
+                break
+    instrument.count("search_candidates", len(seen))
+
+    if exhausted:
+        total = matches
+    elif len(groups) == 1 and len(groups[0]) == 1:
+        total = index.books[groups[0][0]]
+    else:
+        total = None
+    ranked = best[(page - 1) * per_page:]
+    if not ranked:
+        return total, empty
+    ids = [book_id for _, book_id in ranked]
+    rows = {row[0]: row for row in db.execute(
+        f"SELECT Book_ID, Title, Author, Copies FROM books WHERE Book_ID IN ({', '.join('?' * len(ids))})", ids)}
+    found = pd.DataFrame([(*rows[book_id], round(-neg, 3)) for neg, book_id in ranked],
+                         columns=["Book_ID", "Title", "Author", "Copies", "Score"])
+    return total, found
+
+def search_books(query=None, page=None, per_page=PAGE_SIZE):
+    query = query if query is not None else input("Search title/author: ")
+    page = page if page is not None else int(input("Page [1]: ") or 1)
+    total, found = search(query, page, per_page)
+    if not total and found.empty:
+        print(" No matching books." if page == 1 or total == 0 else " No more matching books.")
+        completions = suggest(query) if total == 0 else []
+        if completions:
+            print(" Did you mean:", ", ".join(completions))
+        return
+    if total is None:
+        print(f"\n Matching books (page {page}):\n", found.to_string(index=False))
+        return
+    pages = -(-total // per_page)
+    print(f"\n {total} matching books (page {page} of {pages}):\n", found.to_string(index=False))
+
+# Run circulation steps, each fn(db, *args), as one transaction. The in-memory
+# indexes they touch along the way are dropped if it fails, to reload from disk.
+def _circulate(steps):
+    global _due_index, _popularity
+    db = get_db()
+    try:
+        with db:
+            return [fn(db, *args) for fn, args in steps]
+    except Exception:
+        _due_index = _popularity = None
+        raise
+
+# Issue a copy: copies, loan and log row change together (caller's transaction)
+def _issue(db, book_id, user, today=None):
+    issue_date = today or datetime.today()
+    due_date = issue_date + timedelta(days=LOAN_DAYS)
+    taken = db.execute("UPDATE books SET Copies = Copies - 1 WHERE Book_ID = ? AND Copies > 0",
+                       (book_id,)).rowcount
+    if not taken:
+        return None
+    loan_id = db.execute("INSERT INTO issued_books VALUES (?, ?, ?, ?)",
+                         (book_id, user, issue_date.strftime('%Y-%m-%d'),
+                          due_date.strftime('%Y-%m-%d'))).lastrowid
+    log_action(user, book_id, "Issue", issue_date.strftime('%Y-%m-%d'), 0)
+    if _due_index is not None:
+        _due_index.add(loan_id, book_id, user, due_date)
+    return due_date
+
+@instrument.timed("issue")
+def issue(book_id, user, today=None):
+    return _circulate([(_issue, (book_id, user, today))])[0]
+
+# Return a copy; gives the fine, or None when no such loan exists
+def _return(db, book_id, user, today=None):
+    return_date = today or datetime.today()
+    loan = db.execute("SELECT rowid, Due_Date FROM issued_books WHERE Book_ID = ? AND User = ? "
+                      "ORDER BY rowid LIMIT 1", (book_id, user)).fetchone()
+    if loan is None:
+        return None
+    fine = 0
+    if loan[1]:
+        days_late = (return_date - datetime.strptime(loan[1], '%Y-%m-%d')).days
+        fine = max(0, days_late * FINE_PER_DAY)
+
+    # Another connection may have returned this loan since the SELECT
+    if db.execute("DELETE FROM issued_books WHERE rowid = ?", (loan[0],)).rowcount == 0:
+        return None
+    db.execute("UPDATE books SET Copies = Copies + 1 WHERE Book_ID = ?", (book_id,))
+    log_action(user, book_id, "Return", return_date.strftime('%Y-%m-%d'), fine)
+    if _due_index is not None and loan[1]:
+        _due_index.remove(loan[0], loan[1])
+    return fine
+
+@instrument.timed("return")
+def return_loan(book_id, user, today=None):
+    return _circulate([(_return, (book_id, user, today))])[0]
+
+# Open loans kept sorted by due date (datetime64), so overdue and due-soon
+# queries are a binary search plus one vectorized pass over the hits.
+class DueDateIndex:
+    def __init__(self, rows):
+        self.lock = threading.Lock()
+        self.loan_ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self.book_ids = np.array([r[1] for r in rows], dtype=object)
+        self.users = np.array([r[2] for r in rows], dtype=object)
+        self.due = np.array([r[3] for r in rows], dtype='datetime64[D]')
+
+    def add(self, loan_id, book_id, user, due_date):
+        due = np.datetime64(due_date, 'D')
+        with self.lock:
+            at = np.searchsorted(self.due, due, side='right')
+            self.loan_ids = np.insert(self.loan_ids, at, loan_id)
+            self.book_ids = np.insert(self.book_ids, at, book_id)
+            self.users = np.insert(self.users, at, user)
+            self.due = np.insert(self.due, at, due)
+
+    def remove(self, loan_id, due_date):
+        due = np.datetime64(due_date, 'D')
+        with self.lock:
+            lo, hi = np.searchsorted(self.due, due, 'left'), np.searchsorted(self.due, due, 'right')
+            hits = np.flatnonzero(self.loan_ids[lo:hi] == loan_id)
+            if len(hits):
+                at = lo + hits[0]
+                self.loan_ids, self.book_ids, self.users, self.due = (
+                    np.delete(a, at) for a in (self.loan_ids, self.book_ids, self.users, self.due))
+
+    def _frame(self, lo, hi):
+        return pd.DataFrame({"Book_ID": self.book_ids[lo:hi], "User": self.users[lo:hi],
+                             "Due_Date": self.due[lo:hi]})
+
+    def overdue(self, as_of):
+        as_of = np.datetime64(as_of, 'D')
+        with self.lock:
+            hi = np.searchsorted(self.due, as_of, side='left')
+            report = self._frame(0, hi)
+        days_late = (as_of - report["Due_Date"].to_numpy().astype('datetime64[D]')).astype(np.int64)
+        report["Days_Late"] = days_late
+        report["Fine"] = days_late * FINE_PER_DAY
+        return report
+
+    def due_within(self, days, as_of):
+        as_of = np.datetime64(as_of, 'D')
+        with self.lock:
+            lo = np.searchsorted(self.due, as_of, side='left')
+            hi = np.searchsorted(self.due, as_of + days, side='right')
+            return self._frame(lo, hi)
+
+@instrument.timed("due_index")
+def get_due_index():
+    global _due_index
+    if _due_index is None:
+        _due_index = DueDateIndex(get_db().execute(
+            "SELECT rowid, Book_ID, User, Due_Date FROM issued_books "
+            "WHERE Due_Date IS NOT NULL AND Due_Date != '' ORDER BY Due_Date").fetchall())
+    return _due_index
+
+# Every loan past due on `as_of` with its accrued fine
+def overdue_report(as_of=None):
+    return get_due_index().overdue(as_of or datetime.today())
+
+def due_soon(days, as_of=None):
+    return get_due_index().due_within(days, as_of or datetime.today())
+
+def show_overdue():
+    report = overdue_report()
+    if report.empty:
+        print(" No overdue loans.")
+        return
+    print(f"\n Overdue Loans ({len(report)}), total fines ₹{report['Fine'].sum()}:\n", report)
+
+def show_due_soon(days=None):
+    days = days if days is not None else int(input("Due within how many days? ") or 3)
+    report = due_soon(days)
+    print(f"\n Due in the next {days} days ({len(report)}):\n", report)
+
+# Issue a book (the menu prompts for what the command line did not supply)
+def issue_book(book_id=None, user=None):
+    book_id = book_id or input("Book ID to issue: ")
+    user = user or input("User name: ")
+    due_date = issue(book_id, user)
+    if due_date is None:
+        print(" Book not available.")
+        return
+    print(" Book issued until", due_date.date())
+
+# Return a book
+def return_book(book_id=None, user=None):
+    book_id = book_id or input("Book ID to return: ")
+    user = user or input("User name: ")
+    fine = return_loan(book_id, user)
+    if fine is None:
+        print(" No matching issued book found.")
+        return
+    print(f" Book returned! Fine: ₹{fine}" if fine else " Book returned on time.")
+
+# Log action (joins the caller's transaction when there is one)
+@instrument.timed("log")
+def log_action(user, book_id, action, date, fine):
+    instrument.count("rows_written")
+    db = get_db()
+    owned = not db.in_transaction   # standalone call: commit our own transaction
+    db.execute("INSERT INTO user_log VALUES (?, ?, ?, ?, ?)", (user, book_id, action, date, fine))
+    _count_issues(db, [(user, book_id, action, date, fine)])
+    if owned:
+        db.commit()
+
+# Popularity counters, bumped alongside every "Issue" log row
+def _count_issues(db, entries):
+    issues = [(entry[1], entry[3]) for entry in entries if entry[2] == "Issue"]
+    if not issues:
+        return
+    db.executemany("INSERT INTO issue_counts VALUES (?, 1) "
+                   "ON CONFLICT(Book_ID) DO UPDATE SET Issues = Issues + 1", [(b,) for b, _ in issues])
+    db.executemany("INSERT INTO daily_issues VALUES (?, ?, 1) "
+                   "ON CONFLICT(Day, Book_ID) DO UPDATE SET Issues = Issues + 1", [(d, b) for b, d in issues])
+    if _popularity is not None:
+        _popularity.update(b for b, _ in issues)
+
+def _rebuild_counts(db):
+    db.execute("DELETE FROM issue_counts")
+    db.execute("DELETE FROM daily_issues")
+    db.execute("INSERT INTO issue_counts SELECT Book_ID, COUNT(*) FROM user_log "
+               "WHERE Action = 'Issue' GROUP BY Book_ID")
+    db.execute("INSERT INTO daily_issues SELECT Date, Book_ID, COUNT(*) FROM user_log "
+               "WHERE Action = 'Issue' GROUP BY Date, Book_ID")
+
+def rebuild_popularity():
+    global _popularity
+    db = get_db()
+    with db:
+        _rebuild_counts(db)
+    _popularity = None
+
+# Space-Saving heavy hitters: at most `size` counters, counts overestimate
+# by at most the smallest counter
+class SpaceSaving:
+    def __init__(self, size):
+        self.size = size
+        self.counts = {}
+        self.heap = []      # (count, book_id), stale entries skipped lazily
+
+    def add(self, book_id, n=1):
+        if book_id in self.counts or len(self.counts) < self.size:
+            self.counts[book_id] = self.counts.get(book_id, 0) + n
+        else:
+            while True:
+                count, victim = heapq.heappop(self.heap)
+                if self.counts.get(victim) == count:
+                    break
+            del self.counts[victim]
+            self.counts[book_id] = count + n
+        heapq.heappush(self.heap, (self.counts[book_id], book_id))
+        if len(self.heap) > 4 * self.size:
+            self.heap = [(c, b) for b, c in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def top(self, k):
+        return heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])
+
+# Exact per-book counts plus the TOP_K_CACHE leaders kept in rank order.
+# Counts only ever grow by one, so a book outside the leaders can only join
+# by passing the last one, and a leader only moves up a few places: each
+# update is O(TOP_K_CACHE) at worst and top(k <= TOP_K_CACHE) is a slice.
+class PopularityCounter:
+    def __init__(self, counts, sketch_size=SKETCH_SIZE):
+        self.lock = threading.Lock()
+        self.counts = dict(counts)
+        self.leaders = [book_id for book_id, _ in heapq.nlargest(TOP_K_CACHE, self.counts.items(),
+                                                                 key=lambda item: item[1])]
+        self.leader_set = set(self.leaders)
+        self.sketch = SpaceSaving(sketch_size) if sketch_size else None
+        if self.sketch:
+            for book_id, n in self.counts.items():
+                self.sketch.add(book_id, n)
+
+    def update(self, book_ids):
+        with self.lock:
+            for book_id in book_ids:
+                n = self.counts[book_id] = self.counts.get(book_id, 0) + 1
+                if self.sketch:
+                    self.sketch.add(book_id)
+                self._promote(book_id, n)
+
+    def _promote(self, book_id, n):
+        leaders, counts = self.leaders, self.counts
+        if book_id in self.leader_set:
+            i = leaders.index(book_id)
+        elif len(leaders) < TOP_K_CACHE:
+            leaders.append(book_id)
+            i = len(leaders) - 1
+        elif n > counts[leaders[-1]]:
+            self.leader_set.discard(leaders[-1])
+            leaders[-1] = book_id
+            i = len(leaders) - 1
+        else:
+            return
+        self.leader_set.add(book_id)
+        while i and counts[leaders[i - 1]] < n:
+            leaders[i - 1], leaders[i] = leaders[i], leaders[i - 1]
+            i -= 1
+
+    def top(self, k, approximate=False):
+        with self.lock:
+            if approximate and self.sketch:
+                return self.sketch.top(k)
+            if k <= TOP_K_CACHE:
+                return [(book_id, self.counts[book_id]) for book_id in self.leaders[:k]]
+            # Deeper than the maintained leaders: one scan over every book
+            return heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])
+
+def get_popularity():
+    global _popularity
+    if _popularity is None:
+        _popularity = PopularityCounter(get_db().execute("SELECT Book_ID, Issues FROM issue_counts"))
+    return _popularity
+
+# Most issued books overall, or within the last `days` days
+@instrument.timed("top_books")
+def top_books(k=5, days=None, approximate=False):
+    if days is None:
+        top = get_popularity().top(k, approximate)
+    else:
+        since = (datetime.today() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        top = get_db().execute("SELECT Book_ID, SUM(Issues) AS n FROM daily_issues WHERE Day >= ? "
+                               "GROUP BY Book_ID ORDER BY n DESC LIMIT ?", (since, k)).fetchall()
+    return pd.Series(dict(top), name='count', dtype='int64').rename_axis('Book_ID')
+
+# View usage chart
+def most_borrowed_chart(days=None):
+    top = top_books(5, days)
+
+    if top.empty:
+        print(" No borrow data available.")
+        return
+
+    plt.figure(figsize=(8, 5))
+    top.plot(kind='bar', color='skyblue')
+    plt.title(" Most Borrowed Books" + (f" (last {days} days)" if days else ""))
+    plt.ylabel("Times Borrowed")
+    plt.xlabel("Book ID")
+    plt.xticks(rotation=0)
+    plt.tight_layout()
+    plt.show()
+
+# Export user log, streamed from the database in chunks
+@instrument.timed("export")
+def export_logs():
+    export_path = "exported_user_log.csv"
+    cursor = get_db().execute("SELECT User, Book_ID, Action, Date, Fine FROM user_log ORDER BY rowid")
+    with open(export_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([column[0] for column in cursor.description])
+        while rows := cursor.fetchmany(EXPORT_CHUNK):
+            writer.writerows(rows)
+            instrument.count("rows_written", len(rows))
+        instrument.count("bytes_written", f.tell())
+    print(f" User log exported to {export_path}")
+
+# Circulation server: JSON lines over TCP, one request per line, e.g.
+#   {"op": "issue", "book_id": "B1", "user": "ann"}
+# Operations on the same Book_ID are serialized by a per-book lock; the
+# SQLite work runs on a thread pool and log rows are group-committed.
+class LibraryServer:
+    def __init__(self, workers=DB_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.write_queue = asyncio.Queue()     # (fn, args, future) circulation steps
+        self.loop = None
+
+    async def run_db(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # Queue an issue/return for the next group commit; resolves once it is durable
+    def submit(self, fn, *args):
+        future = self.loop.create_future()
+        self.write_queue.put_nowait((fn, args, future))
+        return future
+
+    async def commit_batch(self, batch):
+        try:
+            results = await self.run_db(_commit_batch, [(fn, args) for fn, args, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    # Group commit: every issue/return that queued up while the last commit was
+    # on disk goes in the next transaction, loan change and log row together,
+    # and a client only hears back once that transaction is committed
+    async def writer(self):
+        batch = []
+        try:
+            while True:
+                batch = [await self.write_queue.get()]
+                while len(batch) < WRITE_BATCH and not self.write_queue.empty():
+                    batch.append(self.write_queue.get_nowait())
+                full, batch = batch, []
+                await self.commit_batch(full)
+        except asyncio.CancelledError:
+            # Shutting down: steps already taken off the queue are committed here
+            if batch:
+                await self.commit_batch(batch)
+            raise
+
+    async def handle(self, request):
+        op = request.get("op")
+        if op == "list":
+            return {"ok": True, "books": await self.run_db(_book_rows, request.get("limit", 100),
+                                                            request.get("offset", 0))}
+        if op == "search":
+            total, found = await self.run_db(search, str(request["query"]), int(request.get("page", 1)),
+                                             int(request.get("per_page", PAGE_SIZE)))
+            return {"ok": True, "total": total, "books": found.values.tolist()}
+        if op == "suggest":
+            return {"ok": True, "terms": await self.run_db(suggest, str(request["prefix"]), int(request.get("k", 10)))}
+        book_id = str(request["book_id"])
+        if op == "add":
+            await self.run_db(add, book_id, request.get("title", ""), request.get("author", ""),
+                              int(request["copies"]))
+            return {"ok": True}
+        # Issues and returns run one after another on the writer, so no two
+        # requests for the same book interleave
+        if op == "issue":
+            due = await self.submit(_issue, book_id, str(request["user"]))
+            if due is None:
+                return {"ok": False, "error": "not available"}
+            return {"ok": True, "due_date": due.strftime('%Y-%m-%d')}
+        if op == "return":
+            fine = await self.submit(_return, book_id, str(request["user"]))
+            if fine is None:
+                return {"ok": False, "error": "no such loan"}
+            return {"ok": True, "fine": fine}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    async def client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    reply = await self.handle(json.loads(line))
+                except (KeyError, ValueError, TypeError) as e:
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=SERVER_HOST, port=SERVER_PORT, ready=None):
+        self.loop = asyncio.get_running_loop()
+        await self.run_db(init_files)
+        write_task = asyncio.create_task(self.writer())
+        server = await asyncio.start_server(self.client, host, port)
+        print(f" Library server listening on {host}:{port}")
+        if ready:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            write_task.cancel()
+            try:
+                await write_task
+            except asyncio.CancelledError:
+                pass
+            pending = []
+            while not self.write_queue.empty():
+                pending.append(self.write_queue.get_nowait())
+            if pending:
+                _commit_batch([(fn, args) for fn, args, _ in pending])
+
+@instrument.timed("commit_batch")
+def _commit_batch(steps):
+    instrument.count("batched_steps", len(steps))
+    return _circulate(steps)
+
+def _book_rows(limit, offset):
+    return [list(row) for row in get_db().execute(
+        "SELECT Book_ID, Title, Author, Copies FROM books ORDER BY Book_ID LIMIT ? OFFSET ?", (limit, offset))]
+
+def serve(host=SERVER_HOST, port=SERVER_PORT):
+    try:
+        asyncio.run(LibraryServer().serve(host, port))
+    except KeyboardInterrupt:
+        print("Server stopped.")
+
+# Load test: concurrent desks issuing and returning against a running server
+async def _desk(host, port, desk, rounds, books, latencies, stats):
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def call(request):
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        return reply
+
+    for i in range(rounds):
+        book_id = f"LT{(desk * 7919 + i) % books}"
+        if (await call({"op": "issue", "book_id": book_id, "user": f"desk{desk}"}))["ok"]:
+            stats["issued"] += 1
+            await call({"op": "return", "book_id": book_id, "user": f"desk{desk}"})
+        else:
+            stats["refused"] += 1
+    writer.close()
+
+async def _load_test(host, port, desks, rounds, books, copies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for b in range(books):
+        writer.write(json.dumps({"op": "add", "book_id": f"LT{b}", "title": "Load test",
+                                 "author": "", "copies": copies}).encode() + b"\n")
+        await writer.drain()
+        await reader.readline()
+    latencies, stats = [], {"issued": 0, "refused": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(_desk(host, port, d, rounds, books, latencies, stats) for d in range(desks)))
+    elapsed = time.perf_counter() - start
+    writer.write(json.dumps({"op": "list", "limit": books, "offset": 0}).encode() + b"\n")
+    await writer.drain()
+    shelf = {row[0]: row[3] for row in json.loads(await reader.readline())["books"]}
+    writer.close()
+    return latencies, stats, elapsed, shelf
+
+def load_test(host=SERVER_HOST, port=SERVER_PORT, desks=32, rounds=200, books=50, copies=3):
+    latencies, stats, elapsed, shelf = asyncio.run(_load_test(host, port, desks, rounds, books, copies))
+    lat = pd.Series(latencies) * 1000
+    print(f" {len(lat)} requests from {desks} desks in {elapsed:.2f}s: {len(lat) / elapsed:,.0f} req/s")
+    print(f" latency p50 {lat.quantile(0.5):.2f} ms, p99 {lat.quantile(0.99):.2f} ms, max {lat.max():.2f} ms")
+    print(f" issued {stats['issued']}, refused (no copy free) {stats['refused']}")
+    oversold = {b: n for b, n in shelf.items() if b.startswith("LT") and (n < 0 or n % copies)}
+    print(" copies consistent" if not oversold else f" copy counts off: {oversold}")
+    return {"requests": len(lat), "seconds": elapsed, "p50_ms": lat.quantile(0.5),
+            "p99_ms": lat.quantile(0.99), **stats}
+
+# Menu
+def menu():
+    init_files()
+    while True:
+        print("\n Library System Menu")
+        print("1. Add Book")
+        print("2. List Books")
+        print("3. Issue Book")
+        print("4. Return Book")
+        print("5. Most Borrowed Books Chart")
+        print("6. Export User Log")
+        print("7. Import CSV Files")
+        print("8. Overdue Report")
+        print("9. Due Soon")
+        print("10. Search Books")
+        print("11. Exit")
+
+        choice = input("Choose option: ")
+        with instrument.action(MENU_ACTIONS.get(choice, "invalid")):
+            if choice == '1':
+                add_book()
+            elif choice == '2':
+                list_books()
+            elif choice == '3':
+                issue_book()
+            elif choice == '4':
+                return_book()
+            elif choice == '5':
+                days = input("Last N days [all time]: ")
+                most_borrowed_chart(int(days) if days else None)
+            elif choice == '6':
+                export_logs()
+            elif choice == '7':
+                if catalog_empty() or input(" This replaces all books, loans and log entries. "
+                                            "Type 'yes' to continue: ").strip().lower() == "yes":
+                    import_csv_files()
+                    print(" CSV files imported (catalog replaced).")
+                else:
+                    print(" Import cancelled.")
+            elif choice == '8':
+                show_overdue()
+            elif choice == '9':
+                show_due_soon()
+            elif choice == '10':
+                search_books()
+            elif choice == '11':
+                print("Exiting system.")
+                break
+            else:
+                print(" Invalid choice.")
+
+# Non-interactive commands for scripts and cron; no command starts the menu
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Library System")
+    commands = parser.add_subparsers(dest="command")
+    add = commands.add_parser("add-book", help="add copies of a book")
+    add.add_argument("book_id")
+    add.add_argument("title")
+    add.add_argument("author")
+    add.add_argument("copies", type=int)
+    listing = commands.add_parser("list", help="print one page of the inventory")
+    listing.add_argument("--page", type=int, default=1)
+    listing.add_argument("--per-page", type=int, default=PAGE_SIZE)
+    find = commands.add_parser("search", help="ranked title/author search")
+    find.add_argument("query", nargs="+")
+    find.add_argument("--page", type=int, default=1)
+    find.add_argument("--per-page", type=int, default=PAGE_SIZE)
+    complete = commands.add_parser("suggest", help="autocomplete a title/author word")
+    complete.add_argument("prefix")
+    complete.add_argument("-k", type=int, default=10)
+    for name in ("issue", "return"):
+        loan = commands.add_parser(name, help=f"{name} one copy")
+        loan.add_argument("book_id")
+        loan.add_argument("user")
+    top = commands.add_parser("top", help="most borrowed books")
+    top.add_argument("-k", type=int, default=5)
+    top.add_argument("--days", type=int)
+    top.add_argument("--chart", action="store_true", help="show the bar chart")
+    commands.add_parser("overdue", help="loans past due with fines")
+    soon = commands.add_parser("due-soon", help="loans due within N days")
+    soon.add_argument("days", type=int, nargs="?", default=3)
+    commands.add_parser("export-logs", help="write the user log to CSV")
+    importing = commands.add_parser("import-csv", help="replace the catalog with books/issued/user_log CSV files")
+    importing.add_argument("--force", action="store_true", help="replace a catalog that already has data")
+    for name in ("serve", "loadtest"):
+        server = commands.add_parser(name, help=f"{name} the circulation server")
+        server.add_argument("--port", type=int, default=SERVER_PORT)
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        menu()
+        return
+    if args.command == "serve":
+        serve(port=args.port)
+        return
+    if args.command == "loadtest":
+        load_test(port=args.port)
+        return
+    init_files()
+    with instrument.action(args.command.replace("-", "_")):
+        if args.command == "add-book":
+            add_book(args.book_id, args.title, args.author, args.copies)
+        elif args.command == "list":
+            list_books(args.page, args.per_page)
+        elif args.command == "search":
+            search_books(" ".join(args.query), args.page, args.per_page)
+        elif args.command == "suggest":
+            print("\n".join(suggest(args.prefix, args.k)))
+        elif args.command == "issue":
+            issue_book(args.book_id, args.user)
+        elif args.command == "return":
+            return_book(args.book_id, args.user)
+        elif args.command == "top":
+            if args.chart:
+                most_borrowed_chart(args.days)
+            else:
+                print(top_books(args.k, args.days).to_string())
+        elif args.command == "overdue":
+            show_overdue()
+        elif args.command == "due-soon":
+            show_due_soon(args.days)
+        elif args.command == "export-logs":
+            export_logs()
+        elif args.command == "import-csv":
+            if not (args.force or catalog_empty()):
+                print(" The catalog already has data; rerun with --force to replace it.")
+                return
+            import_csv_files()
+            print(" CSV files imported.")
+
+if __name__ == "__main__":
+    cli()
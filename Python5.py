@@ -1,124 +1,686 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
-
-class HealthTracker:
-    def __init__(self):
-        self.df = pd.DataFrame(columns=["Date", "Steps", "Sleep", "Calories", "Water"])
-        self.daily_goals = {
-            "steps": 10000,
-            "sleep": 8,  # hours
-            "calories": 2000,
-            "water": 2.5  # Liters
-        }
-        self.bmi_data = []
-        self.calories_data = []
-
-    def add_data(self, date, steps, sleep, calories, water_intake):
-        # Check if the date already exists
-        if date in self.df["Date"].values:
-            self.df.loc[self.df["Date"] == date, ["Steps", "Sleep", "Calories", "Water"]] += [steps, sleep, calories, water_intake]
-        else:
-            new_data = pd.DataFrame([[date, steps, sleep, calories, water_intake]],
-                                    columns=["Date", "Steps", "Sleep", "Calories", "Water"])
-            self.df = pd.concat([self.df, new_data], ignore_index=True)
-
-    def view_data(self):
-        print(self.df)
-
-    def check_goals(self, date):
-        row = self.df[self.df["Date"] == date]
-        if row.empty:
-            print(f"No data for {date}")
-            return
-
-        row = row.iloc[0]
-        print(f"Health Data for {date}:")
-        print(f"Steps: {row['Steps']} / {self.daily_goals['steps']} (Goal)")
-        print(f"Sleep: {row['Sleep']} hours / {self.daily_goals['sleep']} hours (Goal)")
-        print(f"Calories: {row['Calories']} kcal / {self.daily_goals['calories']} kcal (Goal)")
-        print(f"Water Intake: {row['Water']} L / {self.daily_goals['water']} L (Goal)")
-
-        if row['Steps'] >= self.daily_goals['steps']:
-            print("Great job on reaching your daily steps goal!")
-        else:
-            print(f"You need {self.daily_goals['steps'] - row['Steps']} more steps to reach your goal.")
-
-        if row['Sleep'] >= self.daily_goals['sleep']:
-            print("You reached your daily sleep goal!")
-        else:
-            print(f"You need {self.daily_goals['sleep'] - row['Sleep']} more hours of sleep.")
-
-        if row['Calories'] <= self.daily_goals['calories']:
-            print("You are within your daily calorie limit.")
-        else:
-            print(f"You have exceeded your daily calorie goal by {row['Calories'] - self.daily_goals['calories']} kcal.")
-
-        if row['Water'] >= self.daily_goals['water']:
-            print("You reached your daily water intake goal!")
-        else:
-            print(f"You need {self.daily_goals['water'] - row['Water']} more liters of water.")
-
-    def calculate_bmi(self, weight, height):
-        bmi = weight / (height ** 2)
-        self.bmi_data.append(bmi)
-        print(f"Your BMI is: {bmi:.2f}")
-
-    def generate_report(self):
-        print("Weekly Health Report:")
-        week_data = self.df.tail(7).sum()
-        print(f"Steps: {week_data['Steps']} steps")
-        print(f"Sleep: {week_data['Sleep']} hours")
-        print(f"Calories: {week_data['Calories']} kcal")
-        print(f"Water Intake: {week_data['Water']} L")
-
-    def hydration_reminder(self, current_water_intake):
-        if current_water_intake < self.daily_goals["water"]:
-            print("Reminder: You need to drink more water to reach your goal!")
-        else:
-            print("Good job! You've reached your daily water intake goal.")
-
-    def graph_progress(self):
-        # Sort data by Date to make sure it's in chronological order
-        self.df["Date"] = pd.to_datetime(self.df["Date"])
-        self.df = self.df.sort_values(by="Date")
-
-        plt.figure(figsize=(10, 6))
-        plt.plot(self.df["Date"], self.df["Steps"], label="Steps", color="blue", marker="o")
-        plt.plot(self.df["Date"], self.df["Sleep"], label="Sleep (hours)", color="green", marker="o")
-        plt.plot(self.df["Date"], self.df["Calories"], label="Calories", color="red", marker="o")
-        plt.plot(self.df["Date"], self.df["Water"], label="Water Intake (L)", color="orange", marker="o")
-        plt.xlabel("Date")
-        plt.ylabel("Amount")
-        plt.title("Health Tracker Progress")
-        plt.xticks(rotation=45)
-        plt.legend()
-        plt.tight_layout()
-        plt.show()
-
-if __name__ == "__main__":
-    tracker = HealthTracker()
-
-    # Sample data for 5 days
-    tracker.add_data('2025-04-14', 8000, 7, 1800, 2.0)
-    tracker.add_data('2025-04-15', 12000, 8, 1900, 2.2)
-    tracker.add_data('2025-04-16', 9000, 6, 2100, 2.0)
-    tracker.add_data('2025-04-17', 11000, 7, 2000, 2.5)
-    tracker.add_data('2025-04-18', 10000, 8, 1950, 2.0)
-
-    tracker.view_data()
-
-    # Checking daily goal progress for a date
-    tracker.check_goals('2025-04-15')
-
-    # BMI Calculation
-    tracker.calculate_bmi(70, 1.75)
-
-    # Weekly Report
-    tracker.generate_report()
-
-    # Hydration reminder
-    tracker.hydration_reminder(2.0)
-
-    # Graph Progress
-    tracker.graph_progress()
+import os
+import glob
+import argparse
+import json
+import zlib
+import hashlib
+import tempfile
+import numpy as np
+import instrument
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from lazyimport import lazy_import
+
+# Heavy libraries are imported on first use
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
+mpl_figure = lazy_import("matplotlib.figure")
+
+COLUMNS = ["Date", "Steps", "Sleep", "Calories", "Water"]
+# One row per calendar day; samples for the same day are summed into it
+RECORD_DTYPE = np.dtype([("Date", "datetime64[D]"), ("Steps", "i8"), ("Sleep", "f8"),
+                         ("Calories", "f8"), ("Water", "f8")])
+INITIAL_CAPACITY = 64
+
+# Multi-user store: users hash into SHARD_COUNT buckets, each a directory holding
+# a sorted, memory-mapped base file of (User, day) totals plus an append-only log
+HEALTH_STORE = "health_store"
+SHARD_COUNT = 256
+MAX_TRACKERS = 1024      # trackers kept in memory before LRU eviction
+USER_ID_BYTES = 32
+SHARD_DTYPE = np.dtype([("User", f"S{USER_ID_BYTES}")] + [(name, RECORD_DTYPE[name]) for name in COLUMNS])
+COMPACT_LOG_ROWS = 200000
+INGEST_CHUNK = 500000
+
+# Charts: at most one point per horizontal pixel (10in figure at 100dpi)
+PLOT_WIDTH_PX = 1000
+PLOT_SERIES = [("Steps", "Steps", "blue"), ("Sleep", "Sleep (hours)", "green"),
+               ("Calories", "Calories", "red"), ("Water", "Water Intake (L)", "orange")]
+DASHBOARD_DIR = "health_dashboards"
+DASHBOARD_INDEX = "index.json"
+
+# Days are keyed by their integer day number so scalar and bulk lookups agree
+def _day(date):
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+def _days(dates):
+    # Accepts 'YYYY-MM-DD', timestamps or datetime objects; keeps the calendar day
+    return np.asarray(dates, dtype="datetime64[s]").astype("datetime64[D]")
+
+class HealthTracker:
+    def __init__(self):
+        self.data = np.zeros(INITIAL_CAPACITY, dtype=RECORD_DTYPE)
+        self.size = 0
+        self.index = {}          # day -> row in self.data
+        self._frame = None       # cached DataFrame, dropped on every write
+        self._calendar = None    # cached day-dense arrays and prefix sums, same lifetime
+        self.version = 0         # bumped on every write; keys the render cache
+        self._plot_cache = {}    # (version, points, method) -> downsampled series
+        self._rendered = {}      # output path -> render key last written there
+        self.daily_goals = {
+            "steps": 10000,
+            "sleep": 8,  # hours
+            "calories": 2000,
+            "water": 2.5  # Liters
+        }
+        self.bmi_data = []
+        self.calories_data = []
+
+    def _reserve(self, extra):
+        # Double the buffer so appends stay amortized O(1)
+        needed = self.size + extra
+        if needed > len(self.data):
+            grown = np.zeros(max(needed, 2 * len(self.data)), dtype=RECORD_DTYPE)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+
+    def _row(self, day):
+        row = self.index.get(day)
+        if row is None:
+            self._reserve(1)
+            row = self.size
+            self.data["Date"][row] = np.datetime64(day, "D")
+            self.index[day] = row
+            self.size += 1
+        return row
+
+    def add_data(self, date, steps, sleep, calories, water_intake):
+        # Samples for a date already tracked are added to that day's totals
+        row = self._row(_day(date))
+        row = self.data[row]
+        row["Steps"] += steps
+        row["Sleep"] += sleep
+        row["Calories"] += calories
+        row["Water"] += water_intake
+        self._changed()
+
+    @instrument.timed("add_many")
+    def add_many(self, records):
+        # records: DataFrame / dict of columns / structured array keyed by COLUMNS,
+        # or an iterable of (date, steps, sleep, calories, water) tuples
+        # (checked without touching pandas, which may not be loaded yet)
+        if isinstance(records, dict) or hasattr(records, "columns") or getattr(records, "dtype", None) is not None and records.dtype.names:
+            columns = [np.asarray(records[col]) for col in COLUMNS]
+        else:
+            columns = [np.asarray(col) for col in zip(*records)]
+        if not columns or len(columns[0]) == 0:
+            return
+        instrument.count("rows_read", len(columns[0]))
+        days, group = np.unique(_days(columns[0]), return_inverse=True)
+
+        keys = days.astype(np.int64).tolist()
+        rows = np.fromiter((self.index.get(day, -1) for day in keys), dtype=np.int64, count=len(days))
+        new = np.flatnonzero(rows < 0)
+        self._reserve(len(new))
+        rows[new] = np.arange(self.size, self.size + len(new))
+        self.data["Date"][rows[new]] = days[new]
+        self.index.update(zip((keys[i] for i in new), rows[new].tolist()))
+        self.size += len(new)
+
+        # Sum the samples per day, then add each day's total once
+        for col, values in zip(COLUMNS[1:], columns[1:]):
+            totals = np.bincount(group, weights=values.astype(np.float64), minlength=len(days))
+            self.data[col][rows] += totals.astype(self.data.dtype[col])
+        self._changed()
+
+    def _changed(self):
+        self._frame = None
+        self._calendar = None
+        self.version += 1
+
+    @instrument.timed("calendar")
+    def _dense(self):
+        # Lay the days out on a gap-free calendar (first..last tracked day) with
+        # prefix sums, so a date range is two lookups per column
+        if self._calendar is None:
+            days = self.data["Date"][:self.size].astype(np.int64)
+            first = int(days.min()) if self.size else 0
+            span = int(days.max()) - first + 1 if self.size else 0
+            slots = days - first
+            present = np.zeros(span, dtype=bool)
+            present[slots] = True
+            values, prefix = {}, {}
+            for col in COLUMNS[1:]:
+                values[col] = np.zeros(span, dtype=self.data.dtype[col])
+                values[col][slots] = self.data[col][:self.size]
+                prefix[col] = np.concatenate(([0], np.cumsum(values[col])))
+            prefix["Days"] = np.concatenate(([0], np.cumsum(present)))
+            self._calendar = {"first": first, "span": span, "present": present,
+                              "values": values, "prefix": prefix}
+        return self._calendar
+
+    def range_totals(self, start, end):
+        # Totals and per-tracked-day averages for the inclusive calendar range
+        cal = self._dense()
+        lo = min(max(_day(start) - cal["first"], 0), cal["span"])
+        hi = min(max(_day(end) - cal["first"] + 1, lo), cal["span"])
+        prefix = cal["prefix"]
+        days = int(prefix["Days"][hi] - prefix["Days"][lo])
+        totals = {col: prefix[col][hi] - prefix[col][lo] for col in COLUMNS[1:]}
+        averages = {col: totals[col] / days if days else 0.0 for col in COLUMNS[1:]}
+        return {"days": days, "totals": totals, "averages": averages}
+
+    def last_day(self):
+        cal = self._dense()
+        return np.datetime64(cal["first"] + cal["span"] - 1, "D") if self.size else None
+
+    def goal_attainment(self):
+        # Every calendar day against daily_goals at once; untracked days are misses.
+        # Kept with the calendar (so dropped on every write) while the goals hold.
+        cal = self._dense()
+        goals = tuple(self.daily_goals.items())
+        if cal.get("attainment", (None,))[0] == goals:
+            return cal["attainment"][1]
+        values, present = cal["values"], cal["present"]
+        hits = {
+            "steps": values["Steps"] >= self.daily_goals["steps"],
+            "sleep": values["Sleep"] >= self.daily_goals["sleep"],
+            "calories": present & (values["Calories"] <= self.daily_goals["calories"]),
+            "water": values["Water"] >= self.daily_goals["water"],
+        }
+        index = np.arange(cal["span"])
+        result = {}
+        for goal, hit in hits.items():
+            # Streak ending on each day = distance back to the last miss
+            last_miss = np.maximum.accumulate(np.where(hit, -1, index))
+            streak = index - last_miss
+            result[goal] = {
+                "hit_rate": float(hit.mean()) if len(hit) else 0.0,
+                "current_streak": int(streak[-1]) if len(streak) else 0,
+                "longest_streak": int(streak.max()) if len(streak) else 0,
+                "streaks": streak,
+            }
+        cal["attainment"] = (goals, result)
+        return result
+
+    def to_dataframe(self):
+        if self._frame is None:
+            self._frame = pd.DataFrame({col: self.data[col][:self.size] for col in COLUMNS})
+        return self._frame
+
+    @property
+    def df(self):
+        return self.to_dataframe()
+
+    def view_data(self):
+        print(self.to_dataframe())
+
+    def check_goals(self, date):
+        row = self.index.get(_day(date))
+        if row is None:
+            print(f"No data for {date}")
+            return
+
+        row = self.data[row]
+        slot = _day(date) - self._dense()["first"]
+        streaks = {goal: r["streaks"][slot] for goal, r in self.goal_attainment().items()}
+        print(f"Health Data for {date}:")
+        print(f"Steps: {row['Steps']} / {self.daily_goals['steps']} (Goal)")
+        print(f"Sleep: {row['Sleep']} hours / {self.daily_goals['sleep']} hours (Goal)")
+        print(f"Calories: {row['Calories']} kcal / {self.daily_goals['calories']} kcal (Goal)")
+        print(f"Water Intake: {row['Water']} L / {self.daily_goals['water']} L (Goal)")
+
+        if row['Steps'] >= self.daily_goals['steps']:
+            print("Great job on reaching your daily steps goal!")
+        else:
+            print(f"You need {self.daily_goals['steps'] - row['Steps']} more steps to reach your goal.")
+
+        if row['Sleep'] >= self.daily_goals['sleep']:
+            print("You reached your daily sleep goal!")
+        else:
+            print(f"You need {self.daily_goals['sleep'] - row['Sleep']} more hours of sleep.")
+
+        if row['Calories'] <= self.daily_goals['calories']:
+            print("You are within your daily calorie limit.")
+        else:
+            print(f"You have exceeded your daily calorie goal by {row['Calories'] - self.daily_goals['calories']} kcal.")
+
+        if row['Water'] >= self.daily_goals['water']:
+            print("You reached your daily water intake goal!")
+        else:
+            print(f"You need {self.daily_goals['water'] - row['Water']} more liters of water.")
+
+        print("Streaks up to this day: " + ", ".join(f"{goal} {days} day(s)" for goal, days in streaks.items()))
+
+    def calculate_bmi(self, weight, height):
+        bmi = weight / (height ** 2)
+        self.bmi_data.append(bmi)
+        print(f"Your BMI is: {bmi:.2f}")
+
+    def generate_report(self, days=7, end=None):
+        # The last `days` calendar days up to `end` (default: latest tracked day)
+        if not self.size:
+            print("No data tracked yet.")
+            return
+        end = _day(end) if end is not None else _day(self.last_day())
+        start = end - days + 1
+        report = self.range_totals(start, end)
+        totals, averages = report["totals"], report["averages"]
+        print("Weekly Health Report:" if days == 7 else f"{days}-Day Health Report:")
+        print(f"{np.datetime64(start, 'D')} to {np.datetime64(end, 'D')} ({report['days']} day(s) tracked)")
+        print(f"Steps: {totals['Steps']} steps (avg {averages['Steps']:.0f}/day)")
+        print(f"Sleep: {totals['Sleep']} hours (avg {averages['Sleep']:.1f}/day)")
+        print(f"Calories: {totals['Calories']} kcal (avg {averages['Calories']:.0f}/day)")
+        print(f"Water Intake: {totals['Water']} L (avg {averages['Water']:.2f}/day)")
+
+    def goal_report(self):
+        for goal, r in self.goal_attainment().items():
+            print(f"{goal.capitalize():<10} hit {r['hit_rate']:.0%} of days, "
+                  f"current streak {r['current_streak']}, longest {r['longest_streak']}")
+
+    def hydration_reminder(self, current_water_intake):
+        if current_water_intake < self.daily_goals["water"]:
+            print("Reminder: You need to drink more water to reach your goal!")
+        else:
+            print("Good job! You've reached your daily water intake goal.")
+
+    def plot_series(self, points=PLOT_WIDTH_PX, method="lttb"):
+        # Tracked days in date order, each series reduced to about `points` points
+        key = (self.version, points, method)
+        if key not in self._plot_cache:
+            cal = self._dense()
+            slots = np.flatnonzero(cal["present"])
+            x = (cal["first"] + slots).astype("datetime64[D]")
+            reduce = _lttb if method == "lttb" else _minmax
+            self._plot_cache = {key: {col: reduce(x, cal["values"][col][slots], points)
+                                      for col, _, _ in PLOT_SERIES}}
+        return self._plot_cache[key]
+
+    def _draw_progress(self, ax, points, method):
+        series = self.plot_series(points, method)
+        for col, label, color in PLOT_SERIES:
+            x, y = series[col]
+            ax.plot(x, y, label=label, color=color, marker="o" if len(x) <= 60 else None)
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Amount")
+        ax.set_title("Health Tracker Progress")
+        ax.tick_params(axis="x", labelrotation=45)
+        ax.legend()
+
+    @instrument.timed("plot")
+    def graph_progress(self, path=None, points=PLOT_WIDTH_PX, method="lttb"):
+        # method: "lttb" keeps the visual shape, "minmax" keeps every extreme.
+        # With a path the chart is rendered headlessly to that file, and skipped
+        # when the same data was already written there.
+        if path is None:
+            fig, ax = plt.subplots(figsize=(10, 6))
+            self._draw_progress(ax, points, method)
+            fig.tight_layout()
+            plt.show()
+            return
+        key = (self.version, points, method)
+        if self._rendered.get(path) == key and os.path.exists(path):
+            return path
+        fig = mpl_figure.Figure(figsize=(10, 6))
+        self._draw_progress(fig.add_subplot(), points, method)
+        fig.tight_layout()
+        fig.savefig(path)
+        self._rendered[path] = key
+        return path
+
+# Largest-Triangle-Three-Buckets: keep the point of each bucket that spans the
+# biggest triangle with the previous pick and the next bucket's mean
+def _lttb(x, y, threshold):
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return x, y
+    xs = x.astype("datetime64[D]").astype(np.float64)
+    ys = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        mean_x, mean_y = xs[nxt_lo:nxt_hi].mean(), ys[nxt_lo:nxt_hi].mean()
+        ax, ay = xs[keep[i]], ys[keep[i]]
+        area = np.abs((ax - mean_x) * (ys[lo:hi] - ay) - (ax - xs[lo:hi]) * (mean_y - ay))
+        keep[i + 1] = lo + int(area.argmax())
+    return x[keep], y[keep]
+
+# Min/max per bucket: every spike survives, at up to two points per bucket
+def _minmax(x, y, threshold):
+    n = len(y)
+    buckets = max(threshold // 2, 1)
+    if n <= 2 * buckets:
+        return x, y
+    bucket = np.arange(n) * buckets // n
+    order = np.lexsort((y, bucket))
+    starts = np.flatnonzero(np.diff(bucket[order], prepend=-1))
+    ends = np.append(starts[1:], n) - 1
+    keep = np.unique(np.concatenate((order[starts], order[ends], [0, n - 1])))
+    return x[keep], y[keep]
+
+
+# User IDs are stored as UTF-8 in a fixed-width field; longer ones are
+# refused rather than truncated (a truncated ID could never be looked up)
+def _user_key(user):
+    key = str(user).encode("utf-8")
+    if len(key) > USER_ID_BYTES:
+        raise ValueError(f"user ID {str(user)!r} is longer than {USER_ID_BYTES} bytes")
+    return key
+
+def _bucket(user, shards=SHARD_COUNT):
+    return zlib.crc32(user if isinstance(user, bytes) else _user_key(user)) % shards
+
+def _shard_records(users, columns):
+    records = np.zeros(len(users), dtype=SHARD_DTYPE)
+    names, inverse = np.unique(np.asarray(users).astype(str), return_inverse=True)
+    records["User"] = np.array([_user_key(u) for u in names.tolist()], dtype=f"S{USER_ID_BYTES}")[inverse]
+    records["Date"] = _days(columns[0])
+    for col, values in zip(COLUMNS[1:], columns[1:]):
+        records[col] = values
+    return records
+
+def _fold(records):
+    # Sum rows sharing (User, Date) and sort by them, so a user is one contiguous slice
+    if not len(records):
+        return records
+    records = records[np.lexsort((records["Date"], records["User"]))]
+    starts = np.flatnonzero(np.concatenate(([True], (records["User"][1:] != records["User"][:-1]) |
+                                            (records["Date"][1:] != records["Date"][:-1]))))
+    folded = records[starts]
+    for col in COLUMNS[1:]:
+        folded[col] = np.add.reduceat(records[col], starts)
+    return folded
+
+class Shard:
+    # base.<gen>.npy is the folded state; log.<gen>.bin holds raw SHARD_DTYPE rows
+    # appended since. Compaction writes base.<gen+1> and only then drops gen.
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        gens = [int(name.split(".")[1]) for name in os.listdir(path) if name.startswith("base.") and name.endswith(".npy")]
+        self.gen = max(gens, default=0)
+        self._base = None
+        self._cleanup()
+
+    def _file(self, kind, gen=None):
+        ext = "npy" if kind == "base" else "bin"
+        return os.path.join(self.path, f"{kind}.{self.gen if gen is None else gen}.{ext}")
+
+    def _cleanup(self):
+        for name in os.listdir(self.path):
+            parts = name.split(".")
+            if len(parts) == 3 and parts[1].isdigit() and int(parts[1]) != self.gen:
+                os.remove(os.path.join(self.path, name))
+
+    def base(self):
+        if self._base is None:
+            path = self._file("base")
+            self._base = np.load(path, mmap_mode="r") if os.path.exists(path) else np.zeros(0, dtype=SHARD_DTYPE)
+        return self._base
+
+    def log(self):
+        path = self._file("log")
+        return np.fromfile(path, dtype=SHARD_DTYPE) if os.path.exists(path) else np.zeros(0, dtype=SHARD_DTYPE)
+
+    def log_rows(self):
+        path = self._file("log")
+        return os.path.getsize(path) // SHARD_DTYPE.itemsize if os.path.exists(path) else 0
+
+    @instrument.timed("shard_append")
+    def append(self, records):
+        with open(self._file("log"), "ab") as f:
+            records.astype(SHARD_DTYPE).tofile(f)
+            instrument.count("rows_written", len(records))
+            instrument.count("bytes_written", records.nbytes)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @instrument.timed("shard_read")
+    def user_rows(self, user):
+        key = _user_key(user)
+        base = self.base()
+        lo = np.searchsorted(base["User"], key, side="left")
+        hi = np.searchsorted(base["User"], key, side="right")
+        log = self.log()
+        return np.concatenate((np.asarray(base[lo:hi]), log[log["User"] == key]))
+
+    @instrument.timed("shard_compact")
+    def compact(self):
+        folded = _fold(np.concatenate((np.asarray(self.base()), self.log())))
+        tmp = self._file("base", self.gen + 1) + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, folded)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._file("base", self.gen + 1))
+        self._base = None
+        self.gen += 1
+        self._cleanup()
+
+class HealthStore:
+    def __init__(self, root=HEALTH_STORE, shards=SHARD_COUNT, max_trackers=MAX_TRACKERS):
+        self.root = root
+        self.shard_count = shards
+        self.max_trackers = max_trackers
+        self.shards = {}
+        self.trackers = OrderedDict()   # user -> HealthTracker, least recently used first
+
+    def shard(self, number):
+        if number not in self.shards:
+            self.shards[number] = Shard(os.path.join(self.root, f"{number:03d}"))
+        return self.shards[number]
+
+    def tracker(self, user):
+        user = str(user)
+        if user in self.trackers:
+            self.trackers.move_to_end(user)
+            return self.trackers[user]
+        tracker = HealthTracker()
+        tracker.add_many(self.shard(_bucket(user, self.shard_count)).user_rows(user))
+        self.trackers[user] = tracker
+        while len(self.trackers) > self.max_trackers:
+            self.trackers.popitem(last=False)
+        return tracker
+
+    def add_data(self, user, date, steps, sleep, calories, water_intake):
+        self.add_many({"User": [user], "Date": [date], "Steps": [steps], "Sleep": [sleep],
+                       "Calories": [calories], "Water": [water_intake]})
+
+    def add_many(self, records):
+        # records: DataFrame / dict of columns with a User column added to COLUMNS
+        rows = _shard_records(records["User"], [np.asarray(records[col]) for col in COLUMNS])
+        users, inverse = np.unique(rows["User"], return_inverse=True)
+        buckets = np.array([_bucket(u, self.shard_count) for u in users.tolist()], dtype=np.int64)[inverse]
+        order = np.argsort(buckets, kind="stable")
+        bounds = np.flatnonzero(np.diff(buckets[order])) + 1
+        for part in np.split(order, bounds):
+            if len(part):
+                shard = self.shard(int(buckets[part[0]]))
+                shard.append(rows[part])
+                if shard.log_rows() >= COMPACT_LOG_ROWS:
+                    shard.compact()
+        # Keep cached trackers in step with what was just written
+        for key in users.tolist():
+            tracker = self.trackers.get(key.decode("utf-8"))
+            if tracker is not None:
+                tracker.add_many(rows[rows["User"] == key])
+
+    @instrument.timed("render")
+    def export_dashboards(self, users, out_dir=DASHBOARD_DIR, fmt="png", workers=None):
+        # One progress chart per user, rendered headlessly in a process pool;
+        # users whose daily totals hash the same as last time are skipped
+        os.makedirs(out_dir, exist_ok=True)
+        index_path = os.path.join(out_dir, DASHBOARD_INDEX)
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = {}
+
+        tasks, outputs = [], {}
+        for user in map(str, users):
+            rows = _fold(self.shard(_bucket(user, self.shard_count)).user_rows(user))
+            name = f"{hashlib.sha1(user.encode()).hexdigest()[:16]}.{fmt}"
+            outputs[user] = {"file": name, "hash": hashlib.sha1(rows.tobytes()).hexdigest()}
+            if index.get(user) != outputs[user] or not os.path.exists(os.path.join(out_dir, name)):
+                tasks.append((rows, os.path.join(out_dir, name)))
+
+        if tasks:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker) as pool:
+                list(pool.map(_render_dashboard, tasks, chunksize=max(1, len(tasks) // (8 * (os.cpu_count() or 1)))))
+
+        tmp = index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(outputs, f, indent=1)
+        os.replace(tmp, index_path)
+        print(f"Rendered {len(tasks)} dashboards, {len(outputs) - len(tasks)} unchanged, index: {index_path}")
+        return outputs
+
+    def compact(self):
+        for number in range(self.shard_count):
+            if self.shard(number).log_rows():
+                self.shard(number).compact()
+
+    @instrument.timed("ingest")
+    def ingest(self, paths, workers=None):
+        # Parse sample files in parallel, pre-folded and split by shard; then each
+        # shard is merged by exactly one worker, so no two processes share a file
+        paths = sorted(set(paths))
+        os.makedirs(self.root, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=self.root) as tmp, \
+                ProcessPoolExecutor(max_workers=workers) as pool:
+            tasks = [(path, i, tmp, self.shard_count) for i, path in enumerate(paths)]
+            rows = sum(pool.map(_partition_samples, tasks))
+            instrument.count("rows_read", rows)
+            touched = sorted(int(name) for name in os.listdir(tmp))
+            merge = [(os.path.join(self.root, f"{n:03d}"), os.path.join(tmp, f"{n:03d}")) for n in touched]
+            list(pool.map(_merge_shard, merge, chunksize=max(1, len(merge) // (4 * (os.cpu_count() or 1)))))
+        # Shards were rewritten behind our back: reopen them and drop stale trackers
+        for n in touched:
+            self.shards.pop(n, None)
+        for user in [u for u in self.trackers if _bucket(u, self.shard_count) in touched]:
+            del self.trackers[user]
+        print(f"Ingested {rows:,} samples from {len(paths)} file(s) into {len(touched)} shard(s)")
+        return rows
+
+_render_fig = None
+
+# Worker setup: one figure reused for every dashboard
+def _init_render_worker():
+    global _render_fig
+    _render_fig = mpl_figure.Figure(figsize=(10, 6))
+
+def _render_dashboard(task):
+    rows, path = task
+    tracker = HealthTracker()
+    tracker.add_many(rows)
+    _render_fig.clear()
+    tracker._draw_progress(_render_fig.add_subplot(), PLOT_WIDTH_PX, "lttb")
+    _render_fig.tight_layout()
+    _render_fig.savefig(path)
+    return path
+
+# Worker: read one sample CSV (User, Date, Steps, Sleep, Calories, Water)
+# in chunks and spill the folded rows of each shard to <tmp>/<shard>/<file>.npy
+def _partition_samples(task):
+    path, file_no, tmp, shards = task
+    total = 0
+    for part, chunk in enumerate(pd.read_csv(path, chunksize=INGEST_CHUNK, dtype={"User": str})):
+        total += len(chunk)
+        rows = _fold(_shard_records(chunk["User"], [chunk[col].to_numpy() for col in COLUMNS]))
+        buckets = np.array([_bucket(u, shards) for u in rows["User"].tolist()], dtype=np.int64)
+        for number in np.unique(buckets).tolist():
+            out = os.path.join(tmp, f"{number:03d}")
+            os.makedirs(out, exist_ok=True)
+            np.save(os.path.join(out, f"{file_no}.{part}.npy"), rows[buckets == number])
+    return total
+
+def _merge_shard(task):
+    shard_path, parts_dir = task
+    parts = [np.load(os.path.join(parts_dir, name)) for name in sorted(os.listdir(parts_dir))]
+    shard = Shard(shard_path)
+    shard.append(np.concatenate(parts))
+    shard.compact()
+
+def demo():
+    tracker = HealthTracker()
+
+    # Sample data for 5 days
+    tracker.add_data('2025-04-14', 8000, 7, 1800, 2.0)
+    tracker.add_data('2025-04-15', 12000, 8, 1900, 2.2)
+    tracker.add_data('2025-04-16', 9000, 6, 2100, 2.0)
+    tracker.add_data('2025-04-17', 11000, 7, 2000, 2.5)
+    tracker.add_data('2025-04-18', 10000, 8, 1950, 2.0)
+
+    tracker.view_data()
+
+    # Checking daily goal progress for a date
+    tracker.check_goals('2025-04-15')
+
+    # BMI Calculation
+    tracker.calculate_bmi(70, 1.75)
+
+    # Weekly Report
+    tracker.generate_report()
+
+    # Goal hit rates and streaks
+    tracker.goal_report()
+
+    # Hydration reminder
+    tracker.hydration_reminder(2.0)
+
+    # Graph Progress
+    tracker.graph_progress()
+
+# Non-interactive commands against the multi-user store; no command runs the demo
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Health Tracker")
+    parser.add_argument("--store", default=HEALTH_STORE, help="store directory")
+    commands = parser.add_subparsers(dest="command")
+    add = commands.add_parser("add", help="record one sample for a user")
+    add.add_argument("user")
+    add.add_argument("date")
+    for name in ("steps", "sleep", "calories", "water"):
+        add.add_argument(name, type=float)
+    report = commands.add_parser("report", help="totals for the last N calendar days")
+    report.add_argument("user")
+    report.add_argument("--days", type=int, default=7)
+    report.add_argument("--end", help="last day of the report (default: latest tracked)")
+    check = commands.add_parser("check", help="one day against the daily goals")
+    check.add_argument("user")
+    check.add_argument("date")
+    goals = commands.add_parser("goals", help="goal hit rates and streaks")
+    goals.add_argument("user")
+    plot = commands.add_parser("plot", help="progress chart, to a file when --out is given")
+    plot.add_argument("user")
+    plot.add_argument("--out")
+    plot.add_argument("--method", choices=["lttb", "minmax"], default="lttb")
+    ingest = commands.add_parser("ingest", help="bulk load sample CSVs (User,Date,Steps,Sleep,Calories,Water)")
+    ingest.add_argument("patterns", nargs="+")
+    ingest.add_argument("--workers", type=int)
+    dashboards = commands.add_parser("dashboards", help="render one chart per user")
+    dashboards.add_argument("users", nargs="+")
+    dashboards.add_argument("--out", default=DASHBOARD_DIR)
+    dashboards.add_argument("--format", choices=["png", "svg"], default="png")
+    dashboards.add_argument("--workers", type=int)
+    commands.add_parser("compact", help="fold every shard's log into its base file")
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        demo()
+        return
+    store = HealthStore(args.store)
+    with instrument.action(args.command):
+        if args.command == "add":
+            store.add_data(args.user, args.date, args.steps, args.sleep, args.calories, args.water)
+        elif args.command == "report":
+            store.tracker(args.user).generate_report(args.days, args.end)
+        elif args.command == "check":
+            store.tracker(args.user).check_goals(args.date)
+        elif args.command == "goals":
+            store.tracker(args.user).goal_report()
+        elif args.command == "plot":
+            store.tracker(args.user).graph_progress(args.out, method=args.method)
+        elif args.command == "ingest":
+            store.ingest([p for pattern in args.patterns for p in glob.glob(pattern)], args.workers)
+        elif args.command == "dashboards":
+            store.export_dashboards(args.users, args.out, args.format, args.workers)
+        elif args.command == "compact":
+            store.compact()
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,298 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Benchmarks for the non-interactive core of every script, on seeded synthetic
+# data. Each (case, size) runs in its own process and scratch directory, so
+# peak RSS is per run and the scripts' relative data files never collide.
+#   python benchmarks.py run [--sizes 1000,10000,100000] [--cases roster,health] [--out benchmarks.json]
+#   python benchmarks.py compare benchmarks.baseline.json benchmarks.json
+#   python benchmarks.py startup [--budget-ms 200]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_OUT = "benchmarks.json"
+SEED = 42
+LOOP_CAP = 100000       # per-call loops (add_data, issue/return) stop here
+REGRESSION = 1.25       # compare: slower than baseline by this factor fails
+NOISE_FLOOR = 0.05      # compare: operations faster than this never fail
+ENTRY_POINTS = ["project1", "Project2", "Project3", "Python4", "Python5", "storage"]
+STARTUP_BUDGET_MS = 200  # import time allowed per entry point
+HEAVY_MODULES = ["pandas", "matplotlib"]   # must not load until an action needs them
+
+SUBJECTS = ["Math", "Science", "English", "History", "Art"]
+CATEGORIES = ["Food", "Transport", "Rent", "Utilities", "Health", "Fun", "Travel", "Other"]
+
+def _peak_rss_mb():
+    # VmHWM is per process; ru_maxrss would also count the forking parent
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+    except (OSError, StopIteration):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _timed(results, name, fn, items):
+    start = time.perf_counter()
+    fn()
+    results[name] = {"seconds": time.perf_counter() - start, "items": int(items)}
+
+def _dates(rng, n, days=3 * 365, start='2022-01-01'):
+    return (np.datetime64(start) + rng.integers(0, days, n)).astype(str)
+
+# Generators and drivers, one per script. Each gets a scratch cwd and returns
+# {operation: {"seconds", "items"}}.
+
+def bench_roster(n, rng):
+    import project1
+    roster = project1.Roster()
+    ids = [f"S{i:08d}" for i in range(n)]
+    cells = n * len(SUBJECTS)
+    rows = np.repeat(np.arange(n), len(SUBJECTS))
+    subjects = SUBJECTS * n
+    values = rng.integers(30, 101, cells).astype(float)
+    results = {}
+    _timed(results, "add_many", lambda: roster.add_many(ids, ids, rows, subjects, values), n)
+    _timed(results, "get_topper", lambda: project1.get_topper(roster), n)
+    picks = rng.integers(0, n, min(n, 1000))
+    def update_and_rank():
+        for i in picks:
+            roster[ids[i]].marks["Math"] = 100.0
+            project1.get_topper(roster)
+    _timed(results, "update_then_topper", update_and_rank, len(picks))
+    _timed(results, "export_csv", lambda: project1.export_csv("bench.csv", roster=roster), cells)
+    _timed(results, "import_csv", lambda: project1.import_csv("bench.csv", project1.Roster()), cells)
+    return results
+
+def bench_expenses(n, rng):
+    import Project2
+    pd.DataFrame({"Date": _dates(rng, n), "Category": rng.choice(CATEGORIES, n),
+                  "Amount": rng.integers(1, 50000, n) / 100, "Note": ""}).to_csv(Project2.CSV_FILE, index=False)
+    results = {}
+    _timed(results, "init_file", Project2.init_file, n)
+    _timed(results, "generate_summary", lambda: Project2.generate_summary("monthly"), n)
+    _timed(results, "stream_summary", lambda: Project2.stream_summary("weekly"), n)
+    # The streamed summary has to agree with the rollups behind generate_summary
+    for period in ("monthly", "weekly"):
+        pd.testing.assert_frame_equal(Project2.stream_summary(period), Project2.rollup_table(period))
+    appends = min(n, LOOP_CAP)
+    extra = list(zip(_dates(rng, appends), rng.choice(CATEGORIES, appends), rng.integers(1, 50000, appends) / 100))
+    _timed(results, "add_expenses", lambda: [Project2.add_expenses(extra[i:i + 100]) for i in range(0, appends, 100)], appends)
+    _timed(results, "load_expenses", Project2.load_expenses, n + appends)
+    return results
+
+def bench_covid(n, rng):
+    import Project3
+    cities = max(5, int(np.sqrt(n)))
+    days = -(-n // cities)
+    row = np.arange(n)
+    pd.DataFrame({"Date": (np.datetime64('2020-03-01') + row % days).astype(str),
+                  "City": np.array([f"City{c:05d}" for c in range(cities)])[row // days],
+                  "New_Cases": rng.poisson(40, n), "Recoveries": rng.poisson(30, n),
+                  "Deaths": rng.poisson(1, n)}).to_csv(Project3.CSV_FILE, index=False)
+    results = {}
+    _timed(results, "init_file", Project3.init_file, n)
+    _timed(results, "risk_zone_analysis", lambda: Project3.risk_zone_analysis(7), n)
+    _timed(results, "risk_zone_range", lambda: Project3.risk_zone_analysis(start='2020-04-01', end='2020-06-30'), n)
+    _timed(results, "predict_hotspots", Project3.predict_hotspots, n)
+    return results
+
+def bench_library(n, rng):
+    import Python4
+    book_ids = np.array([f"B{i:08d}" for i in range(n)])
+    users = np.array([f"U{i:06d}" for i in range(max(10, n // 10))])
+    pd.DataFrame({"Book_ID": book_ids, "Title": [f"Title {i}" for i in range(n)],
+                  "Author": [f"Author {i % 997}" for i in range(n)],
+                  "Copies": rng.integers(1, 6, n)}).to_csv(Python4.BOOKS_FILE, index=False)
+    issue_dates = pd.to_datetime(_dates(rng, n // 2, days=60, start='2025-01-01'))
+    pd.DataFrame({"Book_ID": rng.choice(book_ids, n // 2), "User": rng.choice(users, n // 2),
+                  "Issue_Date": issue_dates.strftime('%Y-%m-%d'),
+                  "Due_Date": (issue_dates + pd.Timedelta(days=Python4.LOAN_DAYS)).strftime('%Y-%m-%d')}
+                 ).to_csv(Python4.ISSUED_FILE, index=False)
+    pd.DataFrame({"User": rng.choice(users, n), "Book_ID": rng.choice(book_ids, n), "Action": "Issue",
+                  "Date": _dates(rng, n, days=365, start='2024-06-01'), "Fine": 0}).to_csv(Python4.USER_LOG_FILE, index=False)
+    results = {}
+    _timed(results, "init_files", Python4.init_files, n)
+    loans = min(n, LOOP_CAP)
+    picks = rng.choice(book_ids, loans)
+    today = datetime(2025, 3, 1)
+    _timed(results, "issue_book", lambda: [Python4.issue(b, "bench", today) for b in picks], loans)
+    _timed(results, "return_book", lambda: [Python4.return_loan(b, "bench", today) for b in picks], loans)
+    _timed(results, "overdue_report", lambda: Python4.overdue_report(today), n // 2)
+    _timed(results, "top_books", lambda: Python4.top_books(10), n)
+    return results
+
+def bench_health(n, rng):
+    import Python5
+    dates = np.datetime64('2015-01-01T00:00') + np.sort(rng.integers(0, 10 * 365 * 1440, n)).astype('timedelta64[m]')
+    samples = {"Date": dates, "Steps": rng.integers(0, 200, n), "Sleep": rng.random(n) / 60,
+               "Calories": rng.random(n) * 5, "Water": rng.random(n) / 200}
+    loop = min(n, LOOP_CAP)
+    tracker = Python5.HealthTracker()
+    cols = [samples[c][:loop] for c in Python5.COLUMNS]
+    results = {}
+    _timed(results, "add_data", lambda: [tracker.add_data(*row) for row in zip(*cols)], loop)
+    tracker = Python5.HealthTracker()
+    _timed(results, "add_many", lambda: tracker.add_many(samples), n)
+    _timed(results, "generate_report", tracker.generate_report, tracker.size)
+    _timed(results, "goal_attainment", tracker.goal_attainment, tracker.size)
+    _timed(results, "to_dataframe", tracker.to_dataframe, tracker.size)
+    # Ingested user IDs stay strings: "007" and "7" are different users
+    pd.DataFrame({"User": ["007", "7", "007"], "Date": ["2024-01-01", "2024-01-01", "2024-01-02"],
+                  "Steps": [1, 2, 3], "Sleep": 0.0, "Calories": 0.0, "Water": 0.0}).to_csv("ids.csv", index=False)
+    store = Python5.HealthStore()
+    store.ingest(["ids.csv"], workers=1)
+    assert (store.tracker("007").size, store.tracker("7").size) == (2, 1)
+    return results
+
+CASES = {"roster": bench_roster, "expenses": bench_expenses, "covid": bench_covid,
+         "library": bench_library, "health": bench_health}
+
+def _run_one(case, size, seed):
+    sys.path.insert(0, HERE)
+    import matplotlib
+    matplotlib.use("Agg")
+    rng = np.random.default_rng(seed)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        ops = CASES[case](size, rng)
+    print(json.dumps({"ops": ops, "peak_rss_mb": _peak_rss_mb()}))
+
+def _scaling(results):
+    # Exponent of time ~ items^k per operation, fitted on a log-log scale
+    curves = {}
+    for case, by_size in results.items():
+        per_op = {}
+        for run in by_size.values():
+            for op, r in run.get("ops", {}).items():
+                if r["seconds"] > 0 and r["items"] > 0:
+                    per_op.setdefault(op, []).append((np.log(r["items"]), np.log(r["seconds"])))
+        curves[case] = {op: round(float(np.polyfit(*zip(*pts), 1)[0]), 3)
+                        for op, pts in per_op.items() if len({p[0] for p in pts}) > 1}
+    return curves
+
+def run(sizes=DEFAULT_SIZES, cases=None, out=DEFAULT_OUT, seed=SEED):
+    results = {}
+    for case in cases or list(CASES):
+        results[case] = {}
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as scratch:
+                proc = subprocess.run([sys.executable, os.path.abspath(__file__), "_one", case, str(size), str(seed)],
+                                      cwd=scratch, capture_output=True, text=True)
+            if proc.returncode:
+                print(f"{case:<10}{size:>10,}  FAILED\n{proc.stderr.strip().splitlines()[-1] if proc.stderr else ''}")
+                results[case][str(size)] = {"error": proc.stderr[-2000:]}
+                continue
+            run_result = json.loads(proc.stdout.strip().splitlines()[-1])
+            results[case][str(size)] = run_result
+            ops = "  ".join(f"{op} {r['seconds']:.3f}s" for op, r in run_result["ops"].items())
+            print(f"{case:<10}{size:>10,}  {run_result['peak_rss_mb']:8.1f} MB  {ops}")
+
+    report = {
+        "meta": {"created": datetime.now().isoformat(timespec="seconds"), "seed": seed, "sizes": sizes,
+                 "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                 "machine": platform.machine(), "cpus": os.cpu_count()},
+        "results": results,
+        "scaling": _scaling(results),
+    }
+    with open(out, "w") as f:
+        json.dump(report, f, indent=1)
+    print("\nScaling exponents (time ~ items^k):")
+    for case, curves in report["scaling"].items():
+        print(f"  {case:<10}" + "  ".join(f"{op} {k:.2f}" for op, k in curves.items()))
+    print(f"Results written to {out}")
+    return report
+
+def compare(baseline_path, current_path=DEFAULT_OUT, threshold=REGRESSION):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    with open(current_path) as f:
+        current = json.load(f)["results"]
+    regressions = 0
+    print(f"{'case':<10}{'size':>10}  {'operation':<22}{'base s':>10}{'now s':>10}{'ratio':>8}")
+    for case, by_size in current.items():
+        for size, run_result in by_size.items():
+            base_ops = baseline.get(case, {}).get(size, {}).get("ops", {})
+            for op, r in run_result.get("ops", {}).items():
+                if op not in base_ops:
+                    continue
+                before = base_ops[op]["seconds"]
+                ratio = r["seconds"] / before if before else float("inf")
+                flag = "  REGRESSION" if ratio > threshold and r["seconds"] > NOISE_FLOOR else ""
+                regressions += bool(flag)
+                print(f"{case:<10}{int(size):>10,}  {op:<22}{before:>10.4f}{r['seconds']:>10.4f}{ratio:>8.2f}{flag}")
+    print(f"\n{regressions} regression(s) beyond {threshold:.2f}x")
+    return regressions
+
+_BENCH_IMPORT = '''
+import sys, time, json
+sys.path.insert(0, {here!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_ms": elapsed * 1000, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+# Import time of each script in a fresh interpreter (best of `repeat`), plus
+# wall time of `<script> --help`, checked against STARTUP_BUDGET_MS
+def startup(budget_ms=STARTUP_BUDGET_MS, repeat=5):
+    over = 0
+    print(f"{'entry point':<14}{'import ms':>10}{'--help ms':>10}  heavy modules loaded")
+    results = {}
+    for module in ENTRY_POINTS:
+        code = _BENCH_IMPORT.format(here=HERE, module=module, heavy=HEAVY_MODULES)
+        runs = [json.loads(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                          check=True).stdout) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["import_ms"])
+        walls = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(HERE, module + ".py"), "--help"],
+                           capture_output=True, check=True)
+            walls.append((time.perf_counter() - start) * 1000)
+        best["help_ms"] = min(walls)
+        failed = best["import_ms"] > budget_ms or best["heavy"]
+        over += bool(failed)
+        results[module] = best
+        print(f"{module:<14}{best['import_ms']:>10.1f}{best['help_ms']:>10.1f}  "
+              f"{', '.join(best['heavy']) or '-'}{'  OVER BUDGET' if failed else ''}")
+    print(f"\n{over} entry point(s) over the {budget_ms} ms budget")
+    return over, results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of every script")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_cmd = commands.add_parser("run", help="run benchmarks and write a JSON baseline")
+    run_cmd.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                         help="comma separated row counts, e.g. 1000,10000,10000000")
+    run_cmd.add_argument("--cases", help="comma separated subset of: " + ", ".join(CASES))
+    run_cmd.add_argument("--out", default=DEFAULT_OUT)
+    run_cmd.add_argument("--seed", type=int, default=SEED)
+    cmp_cmd = commands.add_parser("compare", help="compare two result files")
+    cmp_cmd.add_argument("baseline")
+    cmp_cmd.add_argument("current", nargs="?", default=DEFAULT_OUT)
+    cmp_cmd.add_argument("--threshold", type=float, default=REGRESSION)
+    start_cmd = commands.add_parser("startup", help="import-time budget for every script")
+    start_cmd.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    one = commands.add_parser("_one")
+    one.add_argument("case", choices=list(CASES))
+    one.add_argument("size", type=int)
+    one.add_argument("seed", type=int)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run([int(s) for s in args.sizes.split(",")], args.cases.split(",") if args.cases else None, args.out, args.seed)
+    elif args.command == "startup":
+        sys.exit(1 if startup(args.budget_ms)[0] else 0)
+    elif args.command == "compare":
+        sys.exit(1 if compare(args.baseline, args.current, args.threshold) else 0)
+    else:
+        _run_one(args.case, args.size, args.seed)
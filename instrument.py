@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import atexit
+import functools
+import threading
+
+# Lightweight instrumentation for the scripts' menu actions and their stages.
+#   INSTRUMENT=1                 record spans and counters, exported at exit
+#   INSTRUMENT_FILE=metrics.prom Prometheus text instead of JSON (by extension)
+#   INSTRUMENT_PROFILE=cpu,mem   cProfile / tracemalloc capture per action
+# Disabled, span() hands back one shared no-op context and count() returns
+# immediately, so the hooks can stay in the hot paths.
+
+ENABLED = os.environ.get("INSTRUMENT", "") not in ("", "0")
+METRICS_FILE = os.environ.get("INSTRUMENT_FILE", "metrics.json")
+PROFILE = {p for p in os.environ.get("INSTRUMENT_PROFILE", "").split(",") if p}
+PROFILE_DIR = os.environ.get("INSTRUMENT_PROFILE_DIR", "profiles")
+
+_spans = {}          # dotted span name -> [calls, total seconds, max seconds]
+_counters = {}       # counter name -> value
+_lock = threading.Lock()
+_local = threading.local()
+
+class _Null:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _Null()
+
+class _Span:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.full = f"{stack[-1]}.{self.name}" if stack else self.name
+        stack.append(self.full)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _local.stack.pop()
+        with _lock:
+            stats = _spans.setdefault(self.full, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+        return False
+
+class _Action(_Span):
+    # A menu action: a top-level span plus the opt-in profilers
+    def __enter__(self):
+        self.profiler = None
+        if "cpu" in PROFILE:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        if "mem" in PROFILE:
+            import tracemalloc
+            tracemalloc.start()
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        super().__exit__(*exc)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        if self.profiler is not None:
+            self.profiler.disable()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            self.profiler.dump_stats(os.path.join(PROFILE_DIR, f"{self.name}-{stamp}.prof"))
+        if "mem" in PROFILE:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            count(f"{self.name}.peak_bytes", peak)
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            with open(os.path.join(PROFILE_DIR, f"{self.name}-{stamp}.mem.txt"), "w") as f:
+                f.write(f"peak {peak} bytes\n")
+                for stat in snapshot.statistics("lineno")[:25]:
+                    f.write(f"{stat}\n")
+        return False
+
+def span(name):
+    if not ENABLED:
+        return _NULL
+    return _Span(name)
+
+def action(name):
+    if not ENABLED:
+        return _NULL
+    return _Action(name)
+
+# Decorator form of span(); the disabled path is one flag check per call
+def timed(name):
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def count(name, value=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def enable(metrics_file=None, profile=None):
+    global ENABLED, METRICS_FILE, PROFILE
+    if metrics_file:
+        METRICS_FILE = metrics_file
+    if profile is not None:
+        PROFILE = set(profile)
+    if not ENABLED:
+        ENABLED = True
+        atexit.register(export)
+
+def snapshot():
+    with _lock:
+        return {"spans": {name: {"calls": s[0], "seconds": s[1], "max_seconds": s[2]} for name, s in _spans.items()},
+                "counters": dict(_counters)}
+
+def _prometheus(data):
+    lines = ["# TYPE instrument_span_calls_total counter",
+             "# TYPE instrument_span_seconds_total counter",
+             "# TYPE instrument_span_seconds_max gauge"]
+    for name, s in sorted(data["spans"].items()):
+        lines.append(f'instrument_span_calls_total{{span="{name}"}} {s["calls"]}')
+        lines.append(f'instrument_span_seconds_total{{span="{name}"}} {s["seconds"]:.6f}')
+        lines.append(f'instrument_span_seconds_max{{span="{name}"}} {s["max_seconds"]:.6f}')
+    lines.append("# TYPE instrument_counter_total counter")
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f'instrument_counter_total{{name="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+# Write everything recorded so far; the format follows the file extension
+def export(path=None):
+    path = path or METRICS_FILE
+    data = snapshot()
+    if not data["spans"] and not data["counters"]:
+        return None
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        if path.endswith((".prom", ".txt")):
+            f.write(_prometheus(data))
+        else:
+            json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+    return path
+
+if ENABLED:
+    atexit.register(export)
@@ -0,0 +1,34 @@
+import importlib
+
+# Stand-in for a heavy module (pandas, matplotlib.pyplot, ...) that imports
+# it on first attribute access, so a menu or one-shot command only pays for
+# the libraries its action actually touches. Attributes are cached on the
+# proxy after the first lookup.
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        if self._module is None:
+            self.__dict__["_module"] = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        value = getattr(self._load(), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+        self.__dict__[attr] = value
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+def lazy_import(name):
+    return LazyModule(name)
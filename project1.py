@@ -1,203 +1,987 @@
-import csv
-import matplotlib.pyplot as plt
-
-# Here we are making student class
-
-class Student:
-    def __init__(self, student_id, name, marks=None):
-        self.id = student_id
-        self.name = name
-        self.marks = marks or {}
-
-    def calculate_percentage(self):
-        if not self.marks:
-            return 0
-        return sum(self.marks.values()) / len(self.marks)
-
-    def calculate_grade(self):
-        pct = self.calculate_percentage()
-        if pct >= 90:
-            return "A"
-        elif pct >= 80:
-            return "B"
-        elif pct >= 70:
-            return "C"
-        elif pct >= 60:
-            return "D"
-        else:
-            return "F"
-
-
-# Here we make  Utility Functions
-
-
-def calculate_gpa(student):
-    if not student.marks:
-        return 0
-    total = 0
-    for score in student.marks.values():
-        if score >= 90:
-            total += 4.0
-        elif score >= 80:
-            total += 3.0
-        elif score >= 70:
-            total += 2.0
-        elif score >= 60:
-            total += 1.0
-        else:
-            total += 0.0
-    return total / len(student.marks)
-
-def get_topper(students):
-    return max(students.values(), key=lambda s: s.calculate_percentage(), default=None)
-
-def plot_student_performance(student):
-    if not student.marks:
-        print("No marks to display.")
-        return
-
-    subjects = list(student.marks.keys())
-    scores = list(student.marks.values())
-
-    plt.figure(figsize=(8, 5))
-    plt.bar(subjects, scores, color='skyblue')
-    plt.title(f"{student.name}'s Performance")
-    plt.xlabel("Subjects")
-    plt.ylabel("Marks")
-    plt.ylim(0, 100)
-    plt.grid(True, axis='y')
-    plt.tight_layout()
-    plt.show()
-
-
-# Main Program Functions
-
-
-students = {}
-
-def add_student():
-    sid = input("Enter student ID: ")
-    name = input("Enter student name: ")
-    if sid in students:
-        print("Student ID already exists.")
-        return
-    students[sid] = Student(sid, name)
-    print("Student added successfully.")
-
-def update_marks():
-    sid = input("Enter student ID: ")
-    if sid not in students:
-        print("Student not found.")
-        return
-    subject = input("Enter subject name: ")
-    try:
-        marks = float(input("Enter marks (0-100): "))
-        if 0 <= marks <= 100:
-            students[sid].marks[subject] = marks
-            print("Marks updated.")
-        else:
-            print("Invalid marks range.")
-    except ValueError:
-        print("Please enter a valid number.")
-
-def delete_student():
-    sid = input("Enter student ID to delete: ")
-    if sid in students:
-        del students[sid]
-        print("Student deleted.")
-    else:
-        print("Student not found.")
-
-def view_summary():
-    if not students:
-        print("No student data available.")
-        return
-    for sid, student in students.items():
-        print(f"\nID: {sid}")
-        print(f"Name: {student.name}")
-        print(f"Marks: {student.marks}")
-        print(f"Percentage: {student.calculate_percentage():.2f}%")
-        print(f"Grade: {student.calculate_grade()}")
-        print(f"GPA: {calculate_gpa(student):.2f}")
-
-def find_topper():
-    topper = get_topper(students)
-    if topper:
-        print(f"\nTopper: {topper.name}")
-        print(f"Percentage: {topper.calculate_percentage():.2f}%")
-        print(f"Grade: {topper.calculate_grade()}")
-    else:
-        print("No students available.")
-
-def export_csv():
-    with open("students.csv", "w", newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(["ID", "Name", "Marks"])
-        for student in students.values():
-            writer.writerow([student.id, student.name, student.marks])
-    print("Data exported to students.csv")
-
-def import_csv():
-    try:
-        with open("students.csv", "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                sid = row["ID"]
-                name = row["Name"]
-                marks = eval(row["Marks"])  # Use safe parsing in real apps
-                students[sid] = Student(sid, name, marks)
-        print("Data imported from students.csv")
-    except FileNotFoundError:
-        print("No existing CSV found.")
-
-def visualize_student():
-    sid = input("Enter student ID: ")
-    if sid in students:
-        plot_student_performance(students[sid])
-    else:
-        print("Student not found.")
-
-def menu():
-    print("""
-===== Student Information System =====
-1. Add Student
-2. Update Marks
-3. Delete Student
-4. View Summary
-5. Find Class Topper
-6. Export to CSV
-7. Import from CSV
-8. Visualize Performance
-0. Exit
-""")
-
-def main():
-    import_csv()
-    while True:
-        menu()
-        choice = input("Enter choice: ")
-        if choice == '1':
-            add_student()
-        elif choice == '2':
-            update_marks()
-        elif choice == '3':
-            delete_student()
-        elif choice == '4':
-            view_summary()
-        elif choice == '5':
-            find_topper()
-        elif choice == '6':
-            export_csv()
-        elif choice == '7':
-            import_csv()
-        elif choice == '8':
-            visualize_student()
-        elif choice == '0':
-            export_csv()
-            print("Exiting... Goodbye!")
-            break
-        else:
-            print("Invalid option. Try again.")
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+import io
+import os
+import csv
+import ast
+import json
+import time
+import heapq
+import tempfile
+import threading
+import argparse
+import contextlib
+import numpy as np
+import instrument
+from bisect import bisect_left, insort
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from lazyimport import lazy_import
+
+# Heavy libraries are imported on first use
+plt = lazy_import("matplotlib.pyplot")
+
+GRADE_THRESHOLDS = [60, 70, 80, 90]
+GRADE_LETTERS = np.array(["F", "D", "C", "B", "A"])
+GRADE_POINTS = np.array([0.0, 1.0, 2.0, 3.0, 4.0])
+CSV_FILE = "students.csv"
+IMPORT_BATCH = 50000    # marks per batched roster insert
+MERGE_FAN_IN = 256      # class part files open at once in batch_report
+SNAPSHOT_FILE = "students.npz"
+WAL_FILE = "students.wal"
+WAL_SYNC_OPS = 64       # fsync the log once this many operations are pending...
+WAL_SYNC_SECONDS = 1.0  # ...or when the oldest pending one is this old
+CHECKPOINT_OPS = 50000  # snapshot and start a new log past this many operations
+MENU_ACTIONS = {'1': 'add_student', '2': 'update_marks', '3': 'delete_student', '4': 'view_summary',
+                '5': 'find_topper', '6': 'export_csv', '7': 'import_csv', '8': 'visualize', '0': 'exit'}
+
+# Here we are making the roster: a (students x subjects) matrix of marks plus
+# a mask of which marks exist, so whole-class metrics are one NumPy pass.
+
+class Roster(MutableMapping):
+    def __init__(self, capacity=16, subject_capacity=8):
+        self.ids = []           # row -> student ID
+        self.names = []         # row -> name
+        self.rows = {}          # student ID -> row
+        self.subjects = {}      # subject -> column
+        self.scores = np.zeros((capacity, subject_capacity))
+        self.mask = np.zeros((capacity, subject_capacity), dtype=bool)
+        # Cached metrics per row; `dirty` rows are recomputed on next read
+        self.pct = np.zeros(capacity)
+        self.gpa = np.zeros(capacity)
+        self.grade = np.zeros(capacity, dtype=np.int8)
+        self.dirty = np.zeros(capacity, dtype=bool)
+        # Sorted (-percentage, seq, ID); seq keeps ties in insertion order
+        self._ranking = []
+        self._rank_keys = {}
+        self._gone = set()      # ranking keys of deleted students, purged on next read
+        self._seqs = {}
+        self._next_seq = 0
+        self._views = []        # row -> Student
+        self._standalone = False  # private roster of one free-standing Student
+
+    def _ensure(self, rows, cols):
+        cap_rows, cap_cols = self.scores.shape
+        if rows <= cap_rows and cols <= cap_cols:
+            return
+        new_rows = max(rows, 2 * cap_rows) if rows > cap_rows else cap_rows
+        new_cols = max(cols, 2 * cap_cols) if cols > cap_cols else cap_cols
+        scores, mask = np.zeros((new_rows, new_cols)), np.zeros((new_rows, new_cols), dtype=bool)
+        scores[:cap_rows, :cap_cols] = self.scores
+        mask[:cap_rows, :cap_cols] = self.mask
+        self.scores, self.mask = scores, mask
+        if new_rows > cap_rows:
+            self.pct, self.gpa, self.grade, self.dirty = (
+                np.concatenate([a, np.zeros(new_rows - cap_rows, dtype=a.dtype)])
+                for a in (self.pct, self.gpa, self.grade, self.dirty))
+
+    def column(self, subject):
+        col = self.subjects.get(subject)
+        if col is None:
+            col = len(self.subjects)
+            self._ensure(len(self.ids), col + 1)
+            self.subjects[subject] = col
+        return col
+
+    def _fill(self, row, marks, view):
+        self.scores[row] = 0
+        self.mask[row] = False
+        for subject, score in (marks or {}).items():
+            col = self.column(subject)
+            self.scores[row, col] = score
+            self.mask[row, col] = True
+        self.dirty[row] = True
+        if view is None:
+            view = Student.__new__(Student)
+        view._roster, view._row = self, row
+        self._views[row] = view
+        return view
+
+    def add(self, student_id, name, marks=None, view=None):
+        row = len(self.ids)
+        self._ensure(row + 1, len(self.subjects))
+        self.ids.append(student_id)
+        self.names.append(name)
+        self.rows[student_id] = row
+        self._views.append(None)
+        self._seqs[student_id] = self._next_seq
+        self._next_seq += 1
+        return self._fill(row, marks, view)
+
+    # Bulk insert: students plus their marks as parallel cell arrays
+    # (index into ids, subject, mark). IDs already on the roster are replaced,
+    # except those in `keep`, whose marks are merged (same student, later batch).
+    def add_many(self, ids, names, cell_rows, cell_subjects, cell_values, keep=()):
+        self._ensure(len(self.ids) + len(ids), len(self.subjects))
+        rows = np.empty(len(ids), dtype=np.int64)
+        for i, (student_id, name) in enumerate(zip(ids, names)):
+            row = self.rows.get(student_id)
+            if row is None:
+                row = len(self.ids)
+                self.ids.append(student_id)
+                self.names.append(name)
+                self.rows[student_id] = row
+                self._seqs[student_id] = self._next_seq
+                self._next_seq += 1
+                view = Student.__new__(Student)
+                view._roster, view._row = self, row
+                self._views.append(view)
+            elif student_id not in keep:
+                self._detach(row)
+                self._views[row] = Student.__new__(Student)
+                self._views[row]._roster, self._views[row]._row = self, row
+            else:
+                rows[i] = row
+                self.names[row] = name
+                continue
+            self.names[row] = name
+            self.scores[row] = 0
+            self.mask[row] = False
+            rows[i] = row
+        if len(cell_subjects):
+            cols = np.fromiter((self.column(subject) for subject in cell_subjects),
+                               dtype=np.int64, count=len(cell_subjects))
+            cells = rows[np.asarray(cell_rows, dtype=np.int64)]
+            self.scores[cells, cols] = np.asarray(cell_values, dtype=float)
+            self.mask[cells, cols] = True
+        self.dirty[rows] = True
+
+    # Take over every student of another roster (replacing same IDs)
+    def merge(self, other):
+        other.compact()
+        n, subjects = len(other), list(other.subjects)
+        rows, cols = np.nonzero(other.mask[:n, :len(subjects)])
+        self.add_many(other.ids, other.names, rows, [subjects[col] for col in cols.tolist()],
+                      other.scores[rows, cols])
+
+    # The Student leaving this row keeps working on a private copy of its data
+    def _detach(self, row):
+        marks = dict(MarksView(self, row))
+        _standalone(self.ids[row], self.names[row], marks, self._views[row])
+
+    def __getitem__(self, student_id):
+        return self._views[self.rows[student_id]]
+
+    def __setitem__(self, student_id, student):
+        if student._roster is self and self.ids[student._row] == student_id:
+            return
+        marks, name = dict(student.marks), student.name
+        # Only a free-standing Student is adopted; one that belongs to another
+        # roster stays there and we get a new view
+        view = student if student._roster._standalone else None
+        row = self.rows.get(student_id)
+        if row is None:
+            self.add(student_id, name, marks, view)
+        else:
+            self._detach(row)
+            self.names[row] = name
+            self._fill(row, marks, view)
+
+    # Deleting leaves a tombstone: the row stays until compact() squeezes the
+    # dead rows out, so a run of deletes costs O(1) each, amortised
+    def __delitem__(self, student_id):
+        row = self.rows.pop(student_id)
+        self._detach(row)
+        key = self._rank_keys.pop(student_id, None)
+        if key is not None:
+            self._gone.add(key)
+        del self._seqs[student_id]
+        self.dirty[row] = False
+        self._views[row] = None
+        if len(self.ids) - len(self.rows) > len(self.rows):
+            self.compact()
+
+    # Drop deleted rows so ids, names and the arrays line up with the live
+    # students again, in insertion order; called before anything reads them whole
+    def compact(self):
+        n = len(self.ids)
+        if len(self.rows) == n:
+            return
+        live = np.zeros(n, dtype=bool)
+        live[np.fromiter(self.rows.values(), dtype=np.int64, count=len(self.rows))] = True
+        keep = np.flatnonzero(live)
+        m = len(keep)
+        for a in (self.scores, self.mask, self.pct, self.gpa, self.grade, self.dirty):
+            a[:m] = a[keep]
+        self.scores[m:n] = 0
+        self.mask[m:n] = False
+        self.dirty[m:n] = False
+        keep = keep.tolist()
+        self.ids = [self.ids[i] for i in keep]
+        self.names = [self.names[i] for i in keep]
+        self._views = [self._views[i] for i in keep]
+        self.rows = {sid: row for row, sid in enumerate(self.ids)}
+        for row, view in enumerate(self._views):
+            view._row = row
+
+    def __iter__(self):
+        self.compact()
+        return iter(list(self.ids))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, student_id):
+        return student_id in self.rows
+
+    # Percentage, letter grade and GPA for the given rows in one vectorized pass
+    def _compute(self, rows):
+        scores, mask = self.scores[rows], self.mask[rows]
+        counts = mask.sum(axis=-1)
+        totals = np.where(mask, scores, 0).sum(axis=-1)
+        pct = np.divide(totals, counts, out=np.zeros(totals.shape), where=counts > 0)
+        points = np.where(mask, GRADE_POINTS[np.digitize(scores, GRADE_THRESHOLDS)], 0)
+        gpa = np.divide(points.sum(axis=-1), counts, out=np.zeros(counts.shape), where=counts > 0)
+        return pct, np.digitize(pct, GRADE_THRESHOLDS), gpa
+
+    # Recompute only rows whose marks changed, and move them in the ranking
+    @instrument.timed("rank")
+    def _flush(self):
+        if self._gone:
+            # A few deletes come out one by one; a burst in one filtering pass
+            if len(self._gone) <= 64:
+                for key in self._gone:
+                    del self._ranking[bisect_left(self._ranking, key)]
+            else:
+                self._ranking = [key for key in self._ranking if key not in self._gone]
+            self._gone.clear()
+        n = len(self.ids)
+        rows = np.flatnonzero(self.dirty[:n])
+        if not len(rows):
+            return
+        self.pct[rows], self.grade[rows], self.gpa[rows] = self._compute(rows)
+        self.dirty[rows] = False
+        if len(rows) > len(self._ranking) // 8:
+            pct = self.pct[:n].tolist()
+            self._rank_keys = {sid: (-pct[row], self._seqs[sid], sid) for sid, row in self.rows.items()}
+            self._ranking = sorted(self._rank_keys.values())
+            return
+        for row, pct in zip(rows.tolist(), self.pct[rows].tolist()):
+            sid = self.ids[row]
+            old = self._rank_keys.get(sid)
+            if old is not None:
+                del self._ranking[bisect_left(self._ranking, old)]
+            key = self._rank_keys[sid] = (-pct, self._seqs[sid], sid)
+            insort(self._ranking, key)
+
+    def percentages(self):
+        self.compact()
+        self._flush()
+        return self.pct[:len(self.ids)]
+
+    def grades(self):
+        self.compact()
+        self._flush()
+        return GRADE_LETTERS[self.grade[:len(self.ids)]]
+
+    def gpas(self):
+        self.compact()
+        self._flush()
+        return self.gpa[:len(self.ids)]
+
+    def metrics(self, row):
+        self._flush()
+        return float(self.pct[row]), str(GRADE_LETTERS[self.grade[row]]), float(self.gpa[row])
+
+    # Ranking queries: O(log n) once the cache is clean
+    def topper(self):
+        self._flush()
+        return self[self._ranking[0][2]] if self._ranking else None
+
+    def top(self, n):
+        self._flush()
+        return [self[key[2]] for key in self._ranking[:n]]
+
+    def rank(self, student_id):
+        self._flush()
+        return bisect_left(self._ranking, self._rank_keys[student_id]) + 1
+
+# A student's marks as a dict-like view onto one roster row
+
+class MarksView(MutableMapping):
+    __slots__ = ("_roster", "_row")
+
+    def __init__(self, roster, row):
+        self._roster, self._row = roster, row
+
+    def __getitem__(self, subject):
+        col = self._roster.subjects.get(subject)
+        if col is None or not self._roster.mask[self._row, col]:
+            raise KeyError(subject)
+        return float(self._roster.scores[self._row, col])
+
+    def __setitem__(self, subject, score):
+        col = self._roster.column(subject)
+        self._roster.scores[self._row, col] = score
+        self._roster.mask[self._row, col] = True
+        self._roster.dirty[self._row] = True
+
+    def __delitem__(self, subject):
+        col = self._roster.subjects.get(subject)
+        if col is None or not self._roster.mask[self._row, col]:
+            raise KeyError(subject)
+        self._roster.mask[self._row, col] = False
+        self._roster.dirty[self._row] = True
+
+    def __iter__(self):
+        row_mask = self._roster.mask[self._row]
+        return iter([subject for subject, col in self._roster.subjects.items() if row_mask[col]])
+
+    def __len__(self):
+        return int(self._roster.mask[self._row].sum())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+# A Student that belongs to no roster lives alone in a private one-row roster
+def _standalone(student_id, name, marks, view):
+    roster = Roster(1, max(1, len(marks or {})))
+    roster._standalone = True
+    return roster.add(student_id, name, marks, view)
+
+# Here we are making student class: a light view onto a roster row
+
+class Student:
+    __slots__ = ("_roster", "_row")
+
+    def __init__(self, student_id, name, marks=None):
+        _standalone(student_id, name, marks, self)
+
+    @property
+    def id(self):
+        return self._roster.ids[self._row]
+
+    @property
+    def name(self):
+        return self._roster.names[self._row]
+
+    @name.setter
+    def name(self, name):
+        self._roster.names[self._row] = name
+
+    @property
+    def marks(self):
+        return MarksView(self._roster, self._row)
+
+    @marks.setter
+    def marks(self, marks):
+        # Copy first: `marks` may be a view of this very row
+        self._roster._fill(self._row, dict(marks or {}), self)
+
+    def calculate_percentage(self):
+        return self._roster.metrics(self._row)[0]
+
+    def calculate_grade(self):
+        return self._roster.metrics(self._row)[1]
+
+
+# Here we make  Utility Functions
+
+
+def calculate_gpa(student):
+    return student._roster.metrics(student._row)[2]
+
+def get_topper(students):
+    if isinstance(students, Roster):
+        return students.topper()
+    return max(students.values(), key=lambda s: s.calculate_percentage(), default=None)
+
+def plot_student_performance(student):
+    if not student.marks:
+        print("No marks to display.")
+        return
+
+    subjects = list(student.marks.keys())
+    scores = list(student.marks.values())
+
+    plt.figure(figsize=(8, 5))
+    plt.bar(subjects, scores, color='skyblue')
+    plt.title(f"{student.name}'s Performance")
+    plt.xlabel("Subjects")
+    plt.ylabel("Marks")
+    plt.ylim(0, 100)
+    plt.grid(True, axis='y')
+    plt.tight_layout()
+    plt.show()
+
+
+# Crash-safe persistence: the roster is a binary snapshot plus a log of the
+# add/mark/delete operations made since. Each operation is one JSON line
+# written through to the OS at once (a crashed process loses nothing); the
+# fsync is shared by up to WAL_SYNC_OPS operations, and a timer syncs whatever
+# has waited WAL_SYNC_SECONDS, idle or not (group commit). Past CHECKPOINT_OPS the roster is snapshotted and the log restarted,
+# which bounds the replay on startup. Snapshot and log carry a generation, so
+# a log left behind by a crash mid-checkpoint is recognised as stale.
+class Journal:
+    def __init__(self, roster, path=WAL_FILE, snapshot=SNAPSHOT_FILE):
+        self.roster = roster
+        self.path, self.snapshot = path, snapshot
+        self.generation = 0
+        self.ops = 0            # operations in the current log
+        self.pending = 0        # written but not yet fsynced
+        self.file = None
+        self.lock = threading.Lock()    # the sync timer runs on its own thread
+        self.timer = None
+
+    def append(self, *op):
+        with self.lock:
+            self.file.write(json.dumps(op, separators=(",", ":")) + "\n")
+            self.file.flush()
+            self.ops += 1
+            self.pending += 1
+            instrument.count("wal_ops")
+            if self.pending >= WAL_SYNC_OPS:
+                self._sync()
+            elif self.timer is None:
+                self.timer = threading.Timer(WAL_SYNC_SECONDS, self.sync)
+                self.timer.daemon = True
+                self.timer.start()
+        if self.ops >= CHECKPOINT_OPS:
+            self.checkpoint()
+
+    def _sync(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.pending and self.file is not None:
+            os.fsync(self.file.fileno())
+            self.pending = 0
+            instrument.count("wal_syncs")
+
+    def sync(self):
+        with self.lock:
+            self._sync()
+
+    # Replace the log with an empty one for the current generation
+    def _start_log(self):
+        with self.lock:
+            self._sync()
+            if self.file is not None:
+                self.file.close()
+            self.file = None
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"generation": self.generation}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        with self.lock:
+            self.file = open(self.path, "a", encoding="utf-8")
+            self.ops = self.pending = 0
+
+    @instrument.timed("checkpoint")
+    def checkpoint(self):
+        roster = self.roster
+        roster.compact()
+        n, k = len(roster), len(roster.subjects)
+        tmp = self.snapshot + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, generation=self.generation + 1, ids=np.array(roster.ids, dtype=str),
+                     names=np.array(roster.names, dtype=str), subjects=np.array(list(roster.subjects), dtype=str),
+                     scores=roster.scores[:n, :k], mask=roster.mask[:n, :k])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot)
+        self.generation += 1
+        self._start_log()
+
+    # Snapshot, then the log on top of it; False when there is no snapshot yet
+    @instrument.timed("recover")
+    def load(self):
+        try:
+            data = np.load(self.snapshot)
+        except FileNotFoundError:
+            return False
+        with data:
+            self.generation = int(data["generation"])
+            ids, names, subjects = data["ids"].tolist(), data["names"].tolist(), data["subjects"].tolist()
+            scores, mask = data["scores"], data["mask"]
+        for subject in subjects:
+            self.roster.column(subject)
+        rows, cols = np.nonzero(mask)
+        self.roster.add_many(ids, names, rows, [subjects[col] for col in cols.tolist()], scores[rows, cols])
+        self._replay()
+        if self.ops >= CHECKPOINT_OPS:
+            self.checkpoint()
+        return True
+
+    def _replay(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            self._start_log()
+            return
+        with f:
+            header = f.readline()
+            try:
+                current = json.loads(header).get("generation") == self.generation
+            except ValueError:
+                current = False
+            if not current or not header.endswith(b"\n"):
+                f.close()
+                self._start_log()
+                return
+            ops, end = 0, f.tell()
+            for line in f:
+                # A torn last line (crash mid-write) is dropped
+                try:
+                    op = json.loads(line) if line.endswith(b"\n") else None
+                except ValueError:
+                    op = None
+                if op is None:
+                    break
+                self._apply(op)
+                ops += 1
+                end += len(line)
+        if end < os.path.getsize(self.path):
+            os.truncate(self.path, end)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.ops = ops
+        instrument.count("wal_replayed", ops)
+
+    def _apply(self, op):
+        roster = self.roster
+        if op[0] == "add":
+            if op[1] not in roster:
+                roster.add(op[1], op[2])
+        elif op[0] == "mark":
+            roster[op[1]].marks[op[2]] = op[3]
+        elif op[0] == "delete":
+            del roster[op[1]]
+
+    def close(self):
+        with self.lock:
+            self._sync()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+# Main Program Functions
+
+
+students = Roster()
+journal = Journal(students)
+
+# Restore the roster from snapshot + log; on the first run students.csv is
+# migrated into a snapshot instead
+def load_roster():
+    if not journal.load():
+        if not import_csv() and os.path.exists(CSV_FILE):
+            raise SystemExit(f"Fix or move {CSV_FILE} before starting.")
+        journal.checkpoint()
+
+# The menu actions prompt for whatever the command line did not supply
+def add_student(sid=None, name=None):
+    sid = sid if sid is not None else input("Enter student ID: ")
+    name = name if name is not None else input("Enter student name: ")
+    if sid in students:
+        print("Student ID already exists.")
+        return False
+    students.add(sid, name)
+    journal.append("add", sid, name)
+    print("Student added successfully.")
+    return True
+
+def update_marks(sid=None, subject=None, marks=None):
+    sid = sid if sid is not None else input("Enter student ID: ")
+    if sid not in students:
+        print("Student not found.")
+        return
+    subject = subject if subject is not None else input("Enter subject name: ")
+    try:
+        marks = float(marks if marks is not None else input("Enter marks (0-100): "))
+        if 0 <= marks <= 100:
+            students[sid].marks[subject] = marks
+            journal.append("mark", sid, subject, marks)
+            print("Marks updated.")
+        else:
+            print("Invalid marks range.")
+    except ValueError:
+        print("Please enter a valid number.")
+
+def delete_student(sid=None):
+    sid = sid if sid is not None else input("Enter student ID to delete: ")
+    if sid in students:
+        del students[sid]
+        journal.append("delete", sid)
+        print("Student deleted.")
+    else:
+        print("Student not found.")
+
+def view_summary():
+    if not students:
+        print("No student data available.")
+        return
+    percentages, grades, gpas = students.percentages(), students.grades(), students.gpas()
+    for row, (sid, student) in enumerate(students.items()):
+        print(f"\nID: {sid}")
+        print(f"Name: {student.name}")
+        print(f"Marks: {student.marks}")
+        print(f"Percentage: {percentages[row]:.2f}%")
+        print(f"Grade: {grades[row]}")
+        print(f"GPA: {gpas[row]:.2f}")
+
+def find_topper():
+    topper = get_topper(students)
+    if topper:
+        print(f"\nTopper: {topper.name}")
+        print(f"Percentage: {topper.calculate_percentage():.2f}%")
+        print(f"Grade: {topper.calculate_grade()}")
+    else:
+        print("No students available.")
+
+# Export as long rows (ID, Name, Subject, Mark) or one column per subject
+@instrument.timed("export")
+def export_csv(path=CSV_FILE, layout="long", roster=None):
+    roster = students if roster is None else roster
+    roster.compact()
+    n = len(roster)
+    subjects = list(roster.subjects)
+    with open(path, "w", newline='') as f:
+        writer = csv.writer(f)
+        if layout == "wide":
+            writer.writerow(["ID", "Name"] + subjects)
+            scores, mask = roster.scores[:n, :len(subjects)], roster.mask[:n, :len(subjects)]
+            cells = np.where(mask, scores.astype(str), "")
+            writer.writerows([sid, name, *row] for sid, name, row in zip(roster.ids, roster.names, cells.tolist()))
+        else:
+            writer.writerow(["ID", "Name", "Subject", "Mark"])
+            mask = roster.mask[:n, :len(subjects)]
+            counts = mask.sum(axis=1)
+            rows, cols = np.nonzero(mask)
+            marks = roster.scores[rows, cols].tolist()
+            at = 0
+            for row, (sid, name) in enumerate(zip(roster.ids, roster.names)):
+                if not counts[row]:
+                    writer.writerow([sid, name, "", ""])
+                    continue
+                end = at + counts[row]
+                writer.writerows([sid, name, subjects[col], mark]
+                                 for col, mark in zip(cols[at:end].tolist(), marks[at:end]))
+                at = end
+        instrument.count("rows_written", n)
+        instrument.count("bytes_written", f.tell())
+    print(f"Data exported to {path}")
+
+# Stream (ID, Name, {subject: mark}) cells out of any supported layout
+def _read_cells(reader, header):
+    if header[:2] != ["ID", "Name"]:
+        raise ValueError(f"expected ID and Name as the first columns, got {','.join(header)}")
+    if header[2:] == ["Marks"]:
+        # Old format: the marks dict's repr, parsed safely
+        for row in reader:
+            marks = ast.literal_eval(row[2]) if row[2] else {}
+            if not isinstance(marks, dict):
+                raise ValueError(f"marks for {row[0]} are not a dict: {row[2]}")
+            yield row[0], row[1], marks.items()
+    elif header[2:] == ["Subject", "Mark"]:
+        for sid, name, subject, mark in reader:
+            yield sid, name, ((subject, mark),) if subject else ()
+    else:
+        subjects = header[2:]
+        for row in reader:
+            yield row[0], row[1], [(subject, mark) for subject, mark in zip(subjects, row[2:]) if mark != ""]
+
+# A file that fails halfway leaves the roster untouched: a non-empty roster
+# only takes the students once the whole file has been read, an empty one is
+# reset. Returns whether the import succeeded.
+@instrument.timed("import")
+def import_csv(path=CSV_FILE, roster=None):
+    roster = students if roster is None else roster
+    staged = Roster() if len(roster) else roster
+    try:
+        with open(path, "r", newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                print(f"{path} is empty.")
+                return True
+            seen = set()
+            ids, names, batch = [], [], {}
+            cell_rows, cell_subjects, cell_values = [], [], []
+            for sid, name, cells in _read_cells(reader, header):
+                i = batch.get(sid)
+                if i is None:
+                    i = batch[sid] = len(ids)
+                    ids.append(sid)
+                    names.append(name)
+                for subject, mark in cells:
+                    cell_rows.append(i)
+                    cell_subjects.append(subject)
+                    cell_values.append(mark)
+                if len(cell_rows) >= IMPORT_BATCH:
+                    staged.add_many(ids, names, cell_rows, cell_subjects, cell_values, keep=seen)
+                    seen.update(ids)
+                    ids, names, batch = [], [], {}
+                    cell_rows, cell_subjects, cell_values = [], [], []
+            staged.add_many(ids, names, cell_rows, cell_subjects, cell_values, keep=seen)
+            instrument.count("rows_read", reader.line_num - 1)
+            instrument.count("bytes_read", f.tell())
+    except FileNotFoundError:
+        print("No existing CSV found.")
+        return False
+    except (ValueError, TypeError, SyntaxError, IndexError) as e:
+        print(f"Could not import {path}: {e or 'short row'}")
+        if staged is roster:
+            roster.__init__()
+        return False
+    if staged is not roster:
+        roster.merge(staged)
+    print(f"Data imported from {path}")
+    return True
+
+# Import/export timings on a synthetic file of `rows` marks (5 per student)
+def benchmark_csv(rows=1_000_000):
+    rng = np.random.default_rng(0)
+    subjects = ["Math", "Science", "English", "History", "Art"]
+    n = rows // len(subjects)
+    roster = Roster(n, len(subjects))
+    roster.add_many([str(i) for i in range(n)], [f"Student {i}" for i in range(n)],
+                    np.repeat(np.arange(n), len(subjects)), subjects * n,
+                    rng.integers(0, 101, n * len(subjects)))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "legacy.csv")
+        with open(legacy, "w", newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["ID", "Name", "Marks"])
+            writer.writerows([sid, name, dict(zip(subjects, row))]
+                             for sid, name, row in zip(roster.ids, roster.names, roster.scores[:n].tolist()))
+        start = time.perf_counter()
+        with open(legacy, "r") as f:
+            # The original loader: eval plus one plain record per row
+            old = {row["ID"]: {"id": row["ID"], "name": row["Name"], "marks": eval(row["Marks"])}
+                   for row in csv.DictReader(f)}
+        results["import legacy (eval, per-row record)"] = time.perf_counter() - start
+        del old
+        start = time.perf_counter()
+        import_csv(legacy, Roster())
+        results["import legacy (literal_eval, batched)"] = time.perf_counter() - start
+        for layout in ("long", "wide"):
+            path = os.path.join(tmp, layout + ".csv")
+            start = time.perf_counter()
+            export_csv(path, layout, roster)
+            results[f"export {layout}"] = time.perf_counter() - start
+            start = time.perf_counter()
+            import_csv(path, Roster())
+            results[f"import {layout}"] = time.perf_counter() - start
+    print(f"\n{rows:,} marks, {n:,} students")
+    for name, seconds in results.items():
+        print(f"{name:<40}{seconds:>8.2f}s")
+    return results
+
+# Batch reports: one roster file per class, <dir>/<school>/<class>.csv
+
+REPORT_COLUMNS = ["District_Rank", "School_Rank", "Class_Rank", "School", "Class",
+                  "ID", "Name", "Percentage", "Grade", "GPA"]
+
+# Worker: rank one class and spill it, best first, to a part file
+def _class_report(task):
+    path, school, class_name, part_path = task
+    roster = Roster()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        ok = import_csv(path, roster)
+    if not ok:
+        return {"school": school, "class": class_name, "path": path, "students": 0,
+                "error": output.getvalue().strip()}
+    percentages, grades, gpas = roster.percentages(), roster.grades(), roster.gpas()
+    ranked = roster.top(len(roster))
+    with open(part_path, "w", newline='') as f:
+        writer = csv.writer(f)
+        for class_rank, student in enumerate(ranked, 1):
+            row = student._row
+            writer.writerow([repr(float(percentages[row])), class_rank, school, class_name,
+                             student.id, student.name, grades[row], f"{gpas[row]:.2f}"])
+    topper = ranked[0] if ranked else None
+    return {"school": school, "class": class_name, "students": len(roster),
+            "mean_percentage": float(percentages.mean()) if len(roster) else 0.0,
+            "mean_gpa": float(gpas.mean()) if len(roster) else 0.0,
+            "topper": f"{topper.name} ({topper.calculate_percentage():.2f}%)" if topper else "-",
+            "part": part_path}
+
+def _part_rows(path):
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            yield -float(row[0]), row
+
+# Merge sorted part files, at most MERGE_FAN_IN open at a time: larger sets
+# are first merged group by group into intermediate parts (merge is stable,
+# so ties keep their class order)
+def _merge_parts(parts, tmp):
+    level = 0
+    while len(parts) > MERGE_FAN_IN:
+        merged = []
+        for i in range(0, len(parts), MERGE_FAN_IN):
+            group = parts[i:i + MERGE_FAN_IN]
+            out = os.path.join(tmp, f"merge{level}.{i // MERGE_FAN_IN}.part")
+            with open(out, "w", newline='') as f:
+                csv.writer(f).writerows(row for _, row in heapq.merge(*map(_part_rows, group),
+                                                                      key=lambda item: item[0]))
+            for part in group:
+                os.remove(part)
+            merged.append(out)
+        parts = merged
+        level += 1
+    return heapq.merge(*map(_part_rows, parts), key=lambda item: item[0])
+
+def _class_files(directory):
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith(".csv"):
+                school = os.path.relpath(root, directory)
+                school = os.path.basename(os.path.abspath(directory)) if school == "." else school
+                yield os.path.join(root, name), school, os.path.splitext(name)[0]
+
+# Rank every class in parallel, then k-way merge the per-class rankings into
+# school and district ranks in one streaming pass
+def batch_report(directory, out_path="district_report.csv", workers=None):
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        tasks = [(path, school, class_name, os.path.join(tmp, f"{i}.part"))
+                 for i, (path, school, class_name) in enumerate(_class_files(directory))]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_class_report, tasks, chunksize=max(1, len(tasks) // (4 * (os.cpu_count() or 1)))))
+        classes = [c for c in results if "error" not in c]
+        failed = [c for c in results if "error" in c]
+
+        school_ranks = {}
+        total = 0
+        with open(out_path, "w", newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(REPORT_COLUMNS)
+            merged = _merge_parts([c["part"] for c in classes], tmp)
+            for total, (_, row) in enumerate(merged, 1):
+                pct, class_rank, school, class_name, sid, name, grade, gpa = row
+                school_ranks[school] = school_ranks.get(school, 0) + 1
+                writer.writerow([total, school_ranks[school], class_rank, school, class_name,
+                                 sid, name, f"{float(pct):.2f}", grade, gpa])
+    elapsed = time.perf_counter() - start
+
+    print(f"\nRanked {total:,} students in {len(classes):,} classes across {len(school_ranks):,} schools "
+          f"in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} students/s)")
+    for c in sorted(classes, key=lambda c: (c["school"], c["class"]))[:20]:
+        print(f"{c['school']:<20}{c['class']:<15}{c['students']:>6} students  "
+              f"avg {c['mean_percentage']:6.2f}%  GPA {c['mean_gpa']:.2f}  topper {c['topper']}")
+    if len(classes) > 20:
+        print(f"... {len(classes) - 20} more classes")
+    if failed:
+        print(f"\n{len(failed)} class file(s) could not be read and are missing from the report:")
+        for c in failed:
+            print(f"  {c['path']}: {c['error']}")
+    print(f"Report written to {out_path}")
+    return classes + failed
+
+def visualize_student():
+    sid = input("Enter student ID: ")
+    if sid in students:
+        plot_student_performance(students[sid])
+    else:
+        print("Student not found.")
+
+def menu():
+    print("""
+===== Student Information System =====
+1. Add Student
+2. Update Marks
+3. Delete Student
+4. View Summary
+5. Find Class Topper
+6. Export to CSV
+7. Import from CSV
+8. Visualize Performance
+0. Exit
+""")
+
+def main():
+    load_roster()
+    while True:
+        menu()
+        choice = input("Enter choice: ")
+        with instrument.action(MENU_ACTIONS.get(choice, "invalid")):
+            if choice == '1':
+                add_student()
+            elif choice == '2':
+                update_marks()
+            elif choice == '3':
+                delete_student()
+            elif choice == '4':
+                view_summary()
+            elif choice == '5':
+                find_topper()
+            elif choice == '6':
+                export_csv()
+            elif choice == '7':
+                if import_csv():
+                    journal.checkpoint()
+            elif choice == '8':
+                visualize_student()
+            elif choice == '0':
+                journal.close()
+                print("Exiting... Goodbye!")
+                break
+            else:
+                print("Invalid option. Try again.")
+
+# Non-interactive commands; with no command the menu starts as before.
+# Roster commands restore the saved roster and log their changes to it.
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Student Information System")
+    commands = parser.add_subparsers(dest="command")
+    add = commands.add_parser("add", help="add a student")
+    add.add_argument("id")
+    add.add_argument("name")
+    add.add_argument("--mark", action="append", default=[], metavar="SUBJECT=MARK")
+    update = commands.add_parser("update", help="set one mark")
+    update.add_argument("id")
+    update.add_argument("subject")
+    update.add_argument("mark", type=float)
+    delete = commands.add_parser("delete", help="delete a student")
+    delete.add_argument("id")
+    commands.add_parser("summary", help="print every student's metrics")
+    commands.add_parser("topper", help="print the class topper")
+    export = commands.add_parser("export", help="write the roster as CSV")
+    export.add_argument("--path", default=CSV_FILE)
+    export.add_argument("--layout", choices=["long", "wide"], default="long")
+    load = commands.add_parser("import", help="merge a CSV file into the roster")
+    load.add_argument("path")
+    bench = commands.add_parser("bench-csv", help="time CSV import/export")
+    bench.add_argument("rows", type=int, nargs="?", default=1_000_000)
+    batch = commands.add_parser("batch", help="district report from <dir>/<school>/<class>.csv")
+    batch.add_argument("directory")
+    batch.add_argument("--out", default="district_report.csv")
+    batch.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        main()
+        return
+    with instrument.action(args.command):
+        if args.command == "bench-csv":
+            benchmark_csv(args.rows)
+        elif args.command == "batch":
+            batch_report(args.directory, args.out, args.workers)
+        else:
+            load_roster()
+            if args.command == "add":
+                # Marks only go to a student this command actually created
+                if add_student(args.id, args.name):
+                    for mark in args.mark:
+                        subject, _, value = mark.partition("=")
+                        update_marks(args.id, subject, value)
+            elif args.command == "update":
+                update_marks(args.id, args.subject, args.mark)
+            elif args.command == "delete":
+                delete_student(args.id)
+            elif args.command == "summary":
+                view_summary()
+            elif args.command == "topper":
+                find_topper()
+            elif args.command == "export":
+                export_csv(args.path, args.layout)
+            elif args.command == "import":
+                if import_csv(args.path):
+                    journal.checkpoint()
+            journal.close()
+
+if __name__ == "__main__":
+    cli()
\ No newline at end of file
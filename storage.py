@@ -0,0 +1,270 @@
+import os
+import sys
+import json
+import argparse
+import shutil
+import subprocess
+import tempfile
+import numpy as np
+import instrument
+from lazyimport import lazy_import
+
+# Heavy libraries are imported on first use
+pd = lazy_import("pandas")
+
+# Typed binary columnar storage for the CSV datasets.
+#   <name>.cols     directory of .npy columns (memory-mappable, no extra deps)
+#   <name>.parquet  Apache Parquet (needs pyarrow)
+#   <name>.feather  Arrow IPC / Feather (needs pyarrow)
+# Dates are held as datetime64, categorical columns as int32 codes + dictionary.
+
+META_FILE = 'meta.json'
+
+def _format(path):
+    ext = os.path.splitext(path)[1]
+    if ext in ('.parquet', '.feather'):
+        return ext[1:]
+    return 'cols'
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet/Feather storage needs pyarrow: pip install pyarrow")
+    return pyarrow
+
+def _typed(df, dates, categories):
+    df = df.copy()
+    for col in dates:
+        df[col] = pd.to_datetime(df[col], errors='coerce').astype('datetime64[ns]')
+    for col in categories:
+        df[col] = df[col].astype('category')
+    return df
+
+# .cols backend: one .npy file per column
+def _write_npy(path, values):
+    with open(path, 'wb') as f:
+        np.save(f, values)
+        f.flush()
+        os.fsync(f.fileno())
+
+def _save_cols(df, path, meta):
+    columns = {}
+    tmp = path + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            _write_npy(os.path.join(tmp, f"{i}.codes.npy"), series.cat.codes.to_numpy(dtype=np.int32))
+            _write_npy(os.path.join(tmp, f"{i}.dict.npy"), np.asarray(series.cat.categories, dtype=str))
+            columns[col] = {"file": i, "kind": "category"}
+        elif pd.api.types.is_string_dtype(series.dtype):
+            _write_npy(os.path.join(tmp, f"{i}.npy"), series.fillna('').to_numpy(dtype=str))
+            columns[col] = {"file": i, "kind": "string"}
+        else:
+            _write_npy(os.path.join(tmp, f"{i}.npy"), series.to_numpy())
+            columns[col] = {"file": i, "kind": "plain"}
+    with open(os.path.join(tmp, META_FILE), 'w') as f:
+        json.dump({"rows": len(df), "columns": columns, "meta": meta or {}}, f)
+    # Swap the finished directory in; a crash mid-swap leaves <path>.old readable
+    old = path + '.old'
+    if os.path.exists(path):
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+def _cols_dir(path):
+    if not os.path.exists(path) and os.path.exists(path + '.old'):
+        return path + '.old'
+    return path
+
+def _cols_info(path):
+    with open(os.path.join(_cols_dir(path), META_FILE)) as f:
+        return json.load(f)
+
+def _cols_arrays(path, columns, mmap):
+    base = _cols_dir(path)
+    info = _cols_info(path)
+    mode = 'r' if mmap else None
+    arrays = {}
+    for col in columns or list(info["columns"]):
+        spec = info["columns"][col]
+        stem = os.path.join(base, str(spec["file"]))
+        if spec["kind"] == "category":
+            arrays[col] = (np.load(stem + '.codes.npy', mmap_mode=mode), np.load(stem + '.dict.npy'))
+        else:
+            arrays[col] = np.load(stem + '.npy', mmap_mode=mode)
+    return info["rows"], arrays
+
+def _frame(arrays, start=0, end=None):
+    data = {}
+    for col, values in arrays.items():
+        if isinstance(values, tuple):
+            codes, categories = values
+            data[col] = pd.Categorical.from_codes(np.asarray(codes[start:end]), categories)
+        else:
+            data[col] = np.asarray(values[start:end])
+    return pd.DataFrame(data)
+
+@instrument.timed("storage_save")
+def save_table(df, path, dates=(), categories=(), meta=None):
+    instrument.count("storage_rows_written", len(df))
+    df = _typed(df, dates, categories)
+    fmt = _format(path)
+    if fmt == 'cols':
+        _save_cols(df, path, meta)
+        return
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_meta = dict(table.schema.metadata or {})
+    schema_meta[b'storage.meta'] = json.dumps(meta or {}).encode()
+    table = table.replace_schema_metadata(schema_meta)
+    tmp = path + '.tmp'
+    if fmt == 'parquet':
+        pa.parquet.write_table(table, tmp)
+    else:
+        pa.feather.write_feather(table, tmp, compression='uncompressed')
+    os.replace(tmp, path)
+
+def exists(path):
+    if _format(path) == 'cols':
+        return os.path.exists(os.path.join(_cols_dir(path), META_FILE))
+    return os.path.exists(path)
+
+@instrument.timed("storage_load")
+def load_table(path, columns=None, mmap=True):
+    fmt = _format(path)
+    if fmt == 'cols':
+        df = _frame(_cols_arrays(path, columns, mmap)[1])
+        instrument.count("storage_rows_read", len(df))
+        return df
+    pa = _pyarrow()
+    if fmt == 'parquet':
+        table = pa.parquet.read_table(path, columns=columns, memory_map=mmap)
+    else:
+        table = pa.feather.read_table(path, columns=columns, memory_map=mmap)
+    return table.to_pandas()
+
+# Yield bounded DataFrame slices without materializing the whole table
+def iter_chunks(path, columns=None, chunk_rows=100000):
+    fmt = _format(path)
+    if fmt == 'cols':
+        rows, arrays = _cols_arrays(path, columns, mmap=True)
+        for start in range(0, rows, chunk_rows):
+            yield _frame(arrays, start, start + chunk_rows)
+        return
+    pa = _pyarrow()
+    if fmt == 'parquet':
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        table = pa.feather.read_table(path, columns=columns, memory_map=True)
+        for start in range(0, table.num_rows, chunk_rows):
+            yield table.slice(start, chunk_rows).to_pandas()
+
+def load_meta(path):
+    fmt = _format(path)
+    if fmt == 'cols':
+        return _cols_info(path)["meta"]
+    pa = _pyarrow()
+    if fmt == 'parquet':
+        schema = pa.parquet.read_schema(path)
+    else:
+        schema = pa.ipc.open_file(pa.memory_map(path)).schema
+    return json.loads((schema.metadata or {}).get(b'storage.meta', b'{}'))
+
+def table_rows(path):
+    fmt = _format(path)
+    if fmt == 'cols':
+        return _cols_info(path)["rows"]
+    pa = _pyarrow()
+    if fmt == 'parquet':
+        return pa.parquet.ParquetFile(path).metadata.num_rows
+    return pa.feather.read_table(path, memory_map=True).num_rows
+
+def csv_to_table(csv_path, path, dates=(), categories=(), meta=None):
+    save_table(pd.read_csv(csv_path), path, dates, categories, meta)
+
+def table_to_csv(path, csv_path):
+    df = load_table(path, mmap=False)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime('%Y-%m-%d')
+    df.to_csv(csv_path, index=False)
+
+# Benchmark: load time and RSS against pd.read_csv
+_BENCH_LOAD = '''
+import sys, time, json, resource
+sys.path.insert(0, {here!r})
+import pandas as pd
+import storage
+def peak_kb():
+    # VmHWM is per address space; ru_maxrss also counts the forking parent
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+before = peak_kb()
+start = time.perf_counter()
+if {fmt!r} == 'csv':
+    df = pd.read_csv({path!r}, usecols={columns!r})
+    for col in {dates!r}:
+        df[col] = pd.to_datetime(df[col])
+else:
+    df = storage.load_table({path!r}, columns={columns!r})
+elapsed = time.perf_counter() - start
+after = peak_kb()
+print(json.dumps({{"seconds": elapsed, "rss_mb": after / 1024, "rss_delta_mb": (after - before) / 1024}}))
+'''
+
+def _bench_once(fmt, path, columns, dates):
+    code = _BENCH_LOAD.format(here=os.path.dirname(os.path.abspath(__file__)),
+                              fmt=fmt, path=path, columns=columns, dates=list(dates))
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+def benchmark(csv_path, dates=(), categories=(), columns=None, repeat=3):
+    formats = ['cols']
+    try:
+        _pyarrow()
+        formats += ['parquet', 'feather']
+    except ImportError:
+        pass
+    dates = [d for d in dates if columns is None or d in columns]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        targets = {'csv': csv_path}
+        for fmt in formats:
+            targets[fmt] = os.path.join(tmp, 'bench.' + fmt)
+            csv_to_table(csv_path, targets[fmt], dates, categories)
+        for fmt, path in targets.items():
+            runs = [_bench_once(fmt, path, columns, dates) for _ in range(repeat)]
+            best = min(runs, key=lambda r: r["seconds"])
+            best["size_mb"] = sum(os.path.getsize(os.path.join(root, name))
+                                  for root, _, names in os.walk(path) for name in names) / 2**20 \
+                if os.path.isdir(path) else os.path.getsize(path) / 2**20
+            results[fmt] = best
+    print(f"{'format':<10}{'load s':>10}{'peak RSS MB':>14}{'RSS +MB':>10}{'size MB':>10}")
+    for fmt, r in results.items():
+        print(f"{fmt:<10}{r['seconds']:>10.3f}{r['rss_mb']:>14.1f}{r['rss_delta_mb']:>10.1f}{r['size_mb']:>10.1f}")
+    return results
+
+if __name__ == "__main__":
+    # python storage.py bench covid_data.csv Date City [col,col,...]
+    parser = argparse.ArgumentParser(description="Columnar storage tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench = commands.add_parser("bench", help="load time and RSS of each format against pd.read_csv")
+    bench.add_argument("csv")
+    bench.add_argument("date_col", nargs="?")
+    bench.add_argument("category_col", nargs="?")
+    bench.add_argument("columns", nargs="?", help="comma separated subset to load")
+    args = parser.parse_args()
+    benchmark(args.csv,
+              dates=[args.date_col] if args.date_col else [],
+              categories=[args.category_col] if args.category_col else [],
+              columns=args.columns.split(',') if args.columns else None)